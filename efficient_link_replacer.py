@@ -11,11 +11,11 @@ This script replaces internal links more efficiently by:
 import os
 import sys
 import re
-import time
 import logging
 from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from notion_client import Client
+from notion_rate_limit import rate_limit_endpoints
 
 # Set up logging
 logging.basicConfig(
@@ -38,6 +38,14 @@ DATABASE_ID = "340b5f5c4f574a6abd215e5b30aac26c"
 # Initialize Notion client
 notion = Client(auth=NOTION_API_KEY)
 
+# Route every Notion endpoint used by this script through the limiter
+rate_limit_endpoints([
+    (notion.databases, "query"),
+    (notion.blocks, "update"),
+    (notion.blocks.children, "list"),
+    (notion.blocks.children, "append"),
+])
+
 class EfficientLinkReplacer:
     def __init__(self):
         self.page_map = {}  # Maps article paths to page IDs
@@ -94,7 +102,8 @@ class EfficientLinkReplacer:
                         article_key = repo_path[6:]  # Remove "en_ta/" prefix
                         self.page_map[article_key] = {
                             "page_id": page["id"],
-                            "title": title
+                            "title": title,
+                            "notion_url": f"https://www.notion.so/{page['id'].replace('-', '')}"
                         }
                         logger.debug(f"Mapped {article_key} -> {title}")
             
@@ -236,13 +245,9 @@ class EfficientLinkReplacer:
                     resolved_path = self.resolve_relative_path(current_path, link_obj["url"])
                     
                     if resolved_path and resolved_path in self.page_map:
-                        # Replace with Notion page link
-                        target_page_id = self.page_map[resolved_path]["page_id"]
-                        new_url = f"https://www.notion.so/{target_page_id.replace('-', '')}"
-                        
-                        # Update the link
+                        # Replace with the Notion page link formatted at load time
                         updated_item = item.copy()
-                        updated_item["text"]["link"]["url"] = new_url
+                        updated_item["text"]["link"]["url"] = self.page_map[resolved_path]["notion_url"]
                         updated_rich_text.append(updated_item)
                         
                         links_replaced += 1
@@ -377,9 +382,6 @@ class EfficientLinkReplacer:
                     # Collect image blocks to add after the current block
                     if image_blocks:
                         all_image_blocks.extend([(i + 1, image_blocks)])
-                    
-                    # Small delay to avoid rate limits
-                    time.sleep(0.1)
             
             # Add image blocks to the page (in reverse order to maintain positions)
             for insert_position, image_blocks in reversed(all_image_blocks):
@@ -396,8 +398,6 @@ class EfficientLinkReplacer:
                                 children=[img_block],
                                 after=after_block_id
                             )
-                            # Update after_block_id for the next image
-                            time.sleep(0.1)
                     else:
                         # Append to end of page
                         notion.blocks.children.append(
@@ -405,8 +405,6 @@ class EfficientLinkReplacer:
                             children=image_blocks
                         )
                     
-                    time.sleep(0.2)  # Rate limiting
-                    
                 except Exception as e:
                     logger.error(f"  Error adding image blocks: {e}")
             
@@ -439,9 +437,6 @@ class EfficientLinkReplacer:
                 if self.update_page_links(page_info["page_id"], article_path, page_info["title"]):
                     success_count += 1
                 
-                # Rate limiting between pages
-                time.sleep(0.3)
-                
             except Exception as e:
                 logger.error(f"Error processing {article_path}: {e}")
                 continue
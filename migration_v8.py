@@ -14,25 +14,39 @@ import yaml
 import json
 import re
 import logging
+import logging.handlers
 import time
 import hashlib
 import argparse
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from notion_client import Client
+from notion_rate_limit import rate_limit_endpoints
 import requests
-import base64
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("final_fixed_migration.log"),
-        logging.StreamHandler()
-    ]
-)
+# Set up logging. File records are buffered and written in batches; anything at
+# WARNING or above flushes the buffer immediately. logging.shutdown() flushes
+# whatever is left at exit. Console output is not buffered so progress shows live.
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+log_file_handler = logging.FileHandler("final_fixed_migration.log")
+log_file_handler.setFormatter(log_formatter)
+log_console_handler = logging.StreamHandler()
+log_console_handler.setFormatter(log_formatter)
+
+logging.basicConfig(level=logging.INFO, handlers=[
+    logging.handlers.MemoryHandler(
+        capacity=500,
+        flushLevel=logging.WARNING,
+        target=log_file_handler
+    ),
+    log_console_handler
+])
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -52,6 +66,15 @@ if not GITEA_API_KEY:
 # Initialize clients
 notion = Client(auth=NOTION_API_KEY)
 
+# Shared Gitea session so connections are kept alive between requests
+gitea_session = requests.Session()
+gitea_session.headers.update({"Authorization": f"token {GITEA_API_KEY}"})
+gitea_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+))
+
 # Constants
 DATABASE_ID = "340b5f5c-4f57-4a6a-bd21-5e5b30aac26c"
 GITEA_API_BASE = "https://git.door43.org/api/v1"
@@ -59,10 +82,82 @@ GITEA_REPO_OWNER = "unfoldingWord"
 GITEA_REPO_NAME = "en_ta"
 GITEA_BRANCH = "master"
 
+# On-disk cache of section configs between runs
+MIGRATOR_CACHE_FILE = Path(".migrator_cache.json")
+MIGRATOR_CACHE_TTL_SECONDS = 60 * 60
+
+# Articles migrated concurrently; notion_rate_limit keeps their Notion calls under the API limit
+MAX_WORKERS = 3
+
+# Notion caps one append at 100 children and 1,000 blocks including nested children
+MAX_CHILDREN_PER_REQUEST = 100
+MAX_BLOCKS_PER_REQUEST = 1000
+
+# Route every Notion endpoint used by this script through the limiter
+rate_limit_endpoints([
+    (notion.pages, "create"),
+    (notion.pages, "update"),
+    (notion.blocks, "delete"),
+    (notion.blocks.children, "append"),
+    (notion.blocks.children, "list"),
+    (notion.databases, "query"),
+    (notion.databases, "retrieve"),
+    (notion.databases, "update"),
+])
+
+# Requests currently being made, keyed so concurrent callers can share one result
+inflight_requests: Dict[tuple, Future] = {}
+inflight_lock = threading.Lock()
+
+def single_flight(key: tuple, fn):
+    """Run fn once per key at a time; concurrent callers with the same key wait for that result."""
+    with inflight_lock:
+        future = inflight_requests.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = inflight_requests[key] = Future()
+    
+    if not is_owner:
+        return future.result()
+    
+    try:
+        result = fn()
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with inflight_lock:
+            inflight_requests.pop(key, None)
+
+# Shared pool for follow-up child appends; kept separate from the article pool
+# so article workers never wait on their own executor
+append_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+def rich_text(content: str) -> List[Dict]:
+    """Build a single-run rich_text array for a plain string."""
+    return [{"type": "text", "text": {"content": content}}]
+
 class FinalFixedTAMigrator:
-    def __init__(self):
+    # Section name -> Manual select option
+    MANUAL_MAPPING = {
+        'intro': 'Introduction',
+        'process': 'Process Manual',
+        'translate': 'Translation Manual',
+        'checking': 'Checking Manual'
+    }
+    
+    def __init__(self, force: bool = False):
         self.sections = {}
         self.content_hashes = {}
+        # Re-migrate pages even when their stored Content Hash matches
+        self.force = force
+        
+        # In-memory caches for Gitea fetches, shared across worker threads
+        self._config_cache: Dict[str, Dict] = {}
+        self._article_cache: Dict[tuple, Dict] = {}
+        self._cache_lock = threading.Lock()
         
         # Unicode superscript mapping for HTML <sup> tag conversion
         self.superscript_map = {
@@ -78,18 +173,16 @@ class FinalFixedTAMigrator:
         }
         
     def fetch_gitea_content(self, path: str) -> Optional[str]:
-        """Fetch content from Gitea API."""
-        url = f"{GITEA_API_BASE}/repos/{GITEA_REPO_OWNER}/{GITEA_REPO_NAME}/contents/{path}"
-        headers = {"Authorization": f"token {GITEA_API_KEY}"}
+        """Fetch raw file content from Gitea API."""
+        # The raw endpoint returns the file bytes directly (no JSON/base64 wrapping)
+        url = f"{GITEA_API_BASE}/repos/{GITEA_REPO_OWNER}/{GITEA_REPO_NAME}/raw/{path}"
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = gitea_session.get(url, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            content = response.content.decode("utf-8")
             
-            if data and "content" in data and data["content"]:
-                content_raw = base64.b64decode(data["content"])
-                content = content_raw.decode("utf-8")
+            if content:
                 return content
             else:
                 logger.warning(f"No content found for Gitea path: {path}")
@@ -99,6 +192,35 @@ class FinalFixedTAMigrator:
             logger.error(f"Error fetching {path}: {e}")
             return None
     
+    def list_gitea_tree(self) -> Optional[List[str]]:
+        """List every file path in the repository with the recursive git tree API."""
+        url = f"{GITEA_API_BASE}/repos/{GITEA_REPO_OWNER}/{GITEA_REPO_NAME}/git/trees/{GITEA_BRANCH}"
+        paths = []
+        page = 1
+        
+        try:
+            while True:
+                response = gitea_session.get(
+                    url,
+                    params={"recursive": "true", "per_page": 1000, "page": page},
+                    timeout=30
+                )
+                response.raise_for_status()
+                data = response.json()
+                
+                paths.extend(entry["path"] for entry in data.get("tree", []) if entry.get("type") == "blob")
+                
+                # Gitea paginates large trees and flags the response as truncated
+                if not data.get("truncated"):
+                    break
+                page += 1
+            
+            return paths
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error listing Gitea tree: {e}")
+            return None
+    
     def convert_to_superscript(self, text: str) -> str:
         """Convert text to Unicode superscript characters."""
         return ''.join(self.superscript_map.get(c, c) for c in text)
@@ -557,7 +679,7 @@ class FinalFixedTAMigrator:
                     "object": "block",
                     "type": "quote",
                     "quote": {
-                        "rich_text": [{"type": "text", "text": {"content": " "}}]
+                        "rich_text": rich_text(" ")
                     }
                 }
             else:
@@ -620,7 +742,24 @@ class FinalFixedTAMigrator:
         return blocks, i
     
     def load_article_from_gitea(self, section_name: str, article_name: str) -> Dict:
-        """Load article content from Gitea API."""
+        """Load article content from Gitea API (cached per section/article)."""
+        cache_key = (section_name, article_name)
+        with self._cache_lock:
+            if cache_key in self._article_cache:
+                return self._article_cache[cache_key]
+        
+        article_data = single_flight(
+            ("article",) + cache_key,
+            lambda: self._fetch_article_from_gitea(section_name, article_name)
+        )
+        
+        with self._cache_lock:
+            self._article_cache[cache_key] = article_data
+        
+        return article_data
+    
+    def _fetch_article_from_gitea(self, section_name: str, article_name: str) -> Dict:
+        """Fetch the title, subtitle and body of an article from Gitea."""
         base_path = f"{section_name}/{article_name}"
         
         title_content = self.fetch_gitea_content(f"{base_path}/title.md") or ""
@@ -643,18 +782,27 @@ class FinalFixedTAMigrator:
         }
     
     def load_config_from_gitea(self, section_name: str) -> Dict:
-        """Load section configuration from Gitea."""
+        """Load section configuration from Gitea (cached per section)."""
+        with self._cache_lock:
+            if section_name in self._config_cache:
+                return self._config_cache[section_name]
+        
         config_content = self.fetch_gitea_content(f"{section_name}/config.yaml")
         toc_content = self.fetch_gitea_content(f"{section_name}/toc.yaml")
         
         config_data = yaml.safe_load(config_content) if config_content else {}
         toc_data = yaml.safe_load(toc_content) if toc_content else {}
         
-        return {
+        section_data = {
             'config': config_data,
             'toc': toc_data,
             'name': section_name
         }
+        
+        with self._cache_lock:
+            self._config_cache[section_name] = section_data
+        
+        return section_data
     
     def get_article_relationships(self, section_name: str, article_name: str) -> Dict:
         """Get relationships from config data."""
@@ -668,7 +816,8 @@ class FinalFixedTAMigrator:
             'section': section_name
         }
     
-    def extract_learning_objective(self, content: str) -> str:
+    @staticmethod
+    def extract_learning_objective(content: str) -> str:
         """Extract or generate a learning objective from content."""
         lines = content.split('\\n')
         for line in lines[:10]:
@@ -681,7 +830,9 @@ class FinalFixedTAMigrator:
         
         return "Learn about translation concepts and techniques."
     
-    def get_content_type(self, article_id: str, section: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def get_content_type(article_id: str, section: str) -> str:
         """Determine content type based on article ID and section."""
         if article_id.startswith('figs-') or article_id.startswith('grammar-'):
             return 'Module'
@@ -690,7 +841,8 @@ class FinalFixedTAMigrator:
         else:
             return 'Topic'
     
-    def get_key_concepts(self, article_id: str, content: str) -> List[str]:
+    @staticmethod
+    def get_key_concepts(article_id: str, content: str) -> Tuple[str, ...]:
         """Extract key concepts from article."""
         concepts = []
         content_lower = content.lower()
@@ -712,9 +864,10 @@ class FinalFixedTAMigrator:
         if any(word in content_lower for word in ['source', 'original', 'hebrew', 'greek']):
             concepts.append('Source Texts')
         
-        return concepts
+        return tuple(concepts)
     
-    def get_target_audience(self, section: str, article_id: str, content: str) -> List[str]:
+    @staticmethod
+    def get_target_audience(section: str, article_id: str, content: str) -> Tuple[str, ...]:
         """Determine target audience."""
         audiences = []
         content_lower = content.lower()
@@ -731,9 +884,10 @@ class FinalFixedTAMigrator:
         if any(word in content_lower for word in ['church', 'pastor']):
             audiences.append('Church Leaders')
         
-        return audiences or ['Translators']
+        return tuple(audiences) or ('Translators',)
     
-    def get_difficulty_level(self, dependencies: List[str]) -> str:
+    @staticmethod
+    def get_difficulty_level(dependencies: List[str]) -> str:
         """Determine difficulty level based on dependencies."""
         if len(dependencies) == 0:
             return 'Beginner'
@@ -742,31 +896,60 @@ class FinalFixedTAMigrator:
         else:
             return 'Advanced'
     
+    def get_migration_hash(self, article_data: Dict, relationships: Dict, sequence_order: int) -> str:
+        """Hash every input that feeds the page properties and content."""
+        hash_input = article_data['content_hash'] + json.dumps(relationships, sort_keys=True) + str(sequence_order)
+        return hashlib.sha256(hash_input.encode()).hexdigest()
+    
+    def get_stored_content_hash(self, page: Dict) -> Optional[str]:
+        """Read the Content Hash property from an existing page, if set."""
+        hash_text = page.get("properties", {}).get("Content Hash", {}).get("rich_text", [])
+        if hash_text:
+            return hash_text[0].get("plain_text")
+        return None
+    
+    @staticmethod
+    def get_property_value(prop: Optional[Dict]):
+        """Reduce a property (request payload or Notion response) to a comparable value."""
+        if not prop:
+            return None
+        
+        for text_type in ("title", "rich_text"):
+            if text_type in prop:
+                return "".join(
+                    item.get("plain_text", item.get("text", {}).get("content", ""))
+                    for item in prop[text_type] or []
+                )
+        
+        if "select" in prop:
+            return (prop["select"] or {}).get("name")
+        
+        if "multi_select" in prop:
+            return tuple(option.get("name") for option in prop["multi_select"] or [])
+        
+        for value_type in ("number", "url"):
+            if value_type in prop:
+                return prop[value_type]
+        
+        return prop
+    
     def create_database_properties(self, article_data: Dict, relationships: Dict, sequence_order: int) -> Dict:
         """Create comprehensive database properties with all metadata."""
         full_content = f"{article_data['content']}\\n{article_data['subtitle']}"
         
-        # Manual mapping
-        manual_mapping = {
-            'intro': 'Introduction',
-            'process': 'Process Manual', 
-            'translate': 'Translation Manual',
-            'checking': 'Checking Manual'
-        }
-        
         properties = {
             # Core identification
             "Title": {
-                "title": [{"type": "text", "text": {"content": article_data['title'] or article_data['article_id']}}]
+                "title": rich_text(article_data['title'] or article_data['article_id'])
             },
             
             "Slug": {
-                "rich_text": [{"type": "text", "text": {"content": article_data['article_id']}}]
+                "rich_text": rich_text(article_data['article_id'])
             },
             
             # Manual and organization
             "Manual": {
-                "select": {"name": manual_mapping[article_data['section']]}
+                "select": {"name": self.MANUAL_MAPPING[article_data['section']]}
             },
             
             "Content Type": {
@@ -780,7 +963,7 @@ class FinalFixedTAMigrator:
             
             # Paths and references
             "Repository Path": {
-                "rich_text": [{"type": "text", "text": {"content": article_data['repository_path']}}]
+                "rich_text": rich_text(article_data['repository_path'])
             },
             
             "Original URL": {
@@ -789,19 +972,19 @@ class FinalFixedTAMigrator:
             
             # Content details
             "Summary": {
-                "rich_text": [{"type": "text", "text": {"content": article_data['subtitle']}}]
+                "rich_text": rich_text(article_data['subtitle'])
             },
             
             "Learning Objective": {
-                "rich_text": [{"type": "text", "text": {"content": self.extract_learning_objective(full_content)}}]
+                "rich_text": rich_text(self.extract_learning_objective(full_content))
             },
             
             # YAML configuration
             "YAML Config": {
-                "rich_text": [{"type": "text", "text": {"content": json.dumps({
+                "rich_text": rich_text(json.dumps({
                     'dependencies': relationships['dependencies'],
                     'recommended': relationships['recommended']
-                }, indent=2)}}]
+                }, separators=(',', ':')))
             },
             
             # Difficulty and concepts
@@ -826,13 +1009,22 @@ class FinalFixedTAMigrator:
             # Translation status
             "Translation Status": {
                 "multi_select": [{"name": "Available in GL"}]
+            },
+            
+            # Change detection for re-runs
+            "Content Hash": {
+                "rich_text": rich_text(self.get_migration_hash(article_data, relationships, sequence_order))
             }
         }
         
         return properties
     
-    def find_existing_page(self, article_id: str) -> Optional[str]:
-        """Find existing page by slug/article_id."""
+    def find_existing_page(self, article_id: str) -> Optional[Dict]:
+        """Find existing page by slug/article_id. Returns the full page object."""
+        return single_flight(("slug", article_id), lambda: self._query_existing_page(article_id))
+    
+    def _query_existing_page(self, article_id: str) -> Optional[Dict]:
+        """Query the database for a page whose Slug equals article_id."""
         try:
             # Query database for existing page with matching slug
             response = notion.databases.query(
@@ -846,9 +1038,9 @@ class FinalFixedTAMigrator:
             )
             
             if response.get("results"):
-                page_id = response["results"][0]["id"]
-                logger.info(f"Found existing page for {article_id}: {page_id}")
-                return page_id
+                page = response["results"][0]
+                logger.debug(f"Found existing page for {article_id}: {page['id']}")
+                return page
             
             return None
             
@@ -856,53 +1048,82 @@ class FinalFixedTAMigrator:
             logger.error(f"Error searching for existing page {article_id}: {e}")
             return None
     
-    def clear_page_content(self, page_id: str):
-        """Clear existing content blocks from a page."""
+    def clear_page_content(self, page_id: str) -> bool:
+        """Clear existing content blocks from a page. Returns True if every block was deleted."""
         try:
-            # Get existing blocks
-            response = notion.blocks.children.list(block_id=page_id)
+            # Get all existing blocks (paginated - pages can hold more than 100 blocks)
+            block_ids = []
+            start_cursor = None
             
-            # Delete all existing blocks
-            for block in response.get("results", []):
-                notion.blocks.delete(block_id=block["id"])
+            while True:
+                response = notion.blocks.children.list(
+                    block_id=page_id,
+                    start_cursor=start_cursor,
+                    page_size=100
+                )
+                
+                block_ids.extend(block["id"] for block in response.get("results", []))
+                
+                if not response.get("has_more"):
+                    break
+                start_cursor = response.get("next_cursor")
+            
+            def delete_block(block_id: str):
+                notion.blocks.delete(block_id=block_id)
             
-            logger.info(f"Cleared existing content from page {page_id}")
+            # Delete all existing blocks concurrently; rate_limited keeps us under the API cap
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                list(executor.map(delete_block, block_ids))
+            
+            logger.debug(f"Cleared {len(block_ids)} existing blocks from page {page_id}")
+            return True
             
         except Exception as e:
             logger.error(f"Error clearing page content {page_id}: {e}")
+            return False
     
     def create_or_update_database_entry(self, article_data: Dict, relationships: Dict, sequence_order: int) -> Optional[str]:
         """Create new database entry or update existing one."""
         try:
             # Check if page already exists
-            existing_page_id = self.find_existing_page(article_data['article_id'])
+            existing_page = self.find_existing_page(article_data['article_id'])
+            properties = self.create_database_properties(article_data, relationships, sequence_order)
             
-            if existing_page_id:
-                # Update existing page
-                logger.info(f"Updating existing page for {article_data['article_id']}")
+            # The hash is written last, once the content is in place, so a failed
+            # content write leaves the old hash and the article is retried next run
+            content_hash_property = properties.pop("Content Hash")
+            new_hash = content_hash_property["rich_text"][0]["text"]["content"]
+            
+            if existing_page:
+                page_id = existing_page['id']
                 
-                # Update properties
-                properties = self.create_database_properties(article_data, relationships, sequence_order)
-                notion.pages.update(
-                    page_id=existing_page_id,
-                    properties=properties
-                )
+                # Skip all API work when nothing has changed since the last migration
+                if not self.force and self.get_stored_content_hash(existing_page) == new_hash:
+                    logger.info(f"Unchanged, skipping {article_data['article_id']}")
+                    return page_id
+                
+                # Update existing page
+                logger.debug(f"Updating existing page for {article_data['article_id']}")
                 
-                # Clear existing content and add new content
-                self.clear_page_content(existing_page_id)
+                # Only send properties whose values actually changed
+                existing_properties = existing_page.get("properties", {})
+                changed_properties = {
+                    name: value for name, value in properties.items()
+                    if self.get_property_value(value) != self.get_property_value(existing_properties.get(name))
+                }
                 
-                if article_data['content']:
-                    blocks = self.convert_markdown_to_blocks(article_data['content'])
-                    if blocks:
-                        self.add_blocks_to_page(existing_page_id, blocks)
-                        logger.info(f"Updated {len(blocks)} blocks in {existing_page_id}")
+                if changed_properties:
+                    logger.debug(f"Updating {len(changed_properties)} changed properties")
+                    notion.pages.update(
+                        page_id=page_id,
+                        properties=changed_properties
+                    )
                 
-                return existing_page_id
+                # Clear existing content before adding the new content
+                content_written = self.clear_page_content(page_id)
             else:
                 # Create new page
-                logger.info(f"Creating new page for {article_data['article_id']}")
-                
-                properties = self.create_database_properties(article_data, relationships, sequence_order)
+                logger.debug(f"Creating new page for {article_data['article_id']}")
                 
                 response = notion.pages.create(
                     parent={"database_id": DATABASE_ID},
@@ -910,81 +1131,155 @@ class FinalFixedTAMigrator:
                 )
                 
                 page_id = response['id']
-                logger.info(f"Created database entry for {article_data['article_id']}: {page_id}")
-                
-                # Add content using clean markdown processing
-                if article_data['content']:
-                    blocks = self.convert_markdown_to_blocks(article_data['content'])
-                    if blocks:
-                        self.add_blocks_to_page(page_id, blocks)
-                        logger.info(f"Added {len(blocks)} blocks to {page_id}")
-                
-                return page_id
+                logger.debug(f"Created database entry for {article_data['article_id']}: {page_id}")
+                content_written = True
+            
+            # Add content using clean markdown processing
+            if content_written and article_data['content']:
+                blocks = self.convert_markdown_to_blocks(article_data['content'])
+                if blocks:
+                    content_written = self.add_blocks_to_page(page_id, blocks)
+                    logger.debug(f"Added {len(blocks)} blocks to {page_id}")
+            
+            if not content_written:
+                logger.error(f"Content for {article_data['article_id']} was not fully written, leaving its Content Hash unchanged")
+                return None
+            
+            # Record the hash only now that the page content matches it
+            notion.pages.update(
+                page_id=page_id,
+                properties={"Content Hash": content_hash_property}
+            )
+            
+            return page_id
             
         except Exception as e:
             logger.error(f"Error creating/updating database entry for {article_data['article_id']}: {e}")
             return None
     
-    def add_blocks_to_page(self, page_id: str, blocks: List[Dict]):
-        """Add blocks to page in batches, handling nested children."""
-        batch_size = 100
+    def append_children(self, parent_block_id: str, children: List[Dict], batch_size: int = 100):
+        """Append children to a block in order, at most batch_size per request."""
+        for i in range(0, len(children), batch_size):
+            notion.blocks.children.append(
+                block_id=parent_block_id,
+                children=children[i:i + batch_size]
+            )
+    
+    def count_blocks(self, block: Dict) -> int:
+        """Count a block plus all of its nested children."""
+        block_type = block.get("type")
+        children = block[block_type].get("children", []) if block_type and block_type in block else []
+        return 1 + sum(self.count_blocks(child) for child in children)
+    
+    def add_blocks_to_page(self, page_id: str, blocks: List[Dict]) -> bool:
+        """Add blocks to page in batches, sending nested children inline. Returns True if every batch was added."""
+        batch = []
+        batch_block_count = 0
+        children_to_process = []
         
-        for i in range(0, len(blocks), batch_size):
-            batch = blocks[i:i + batch_size]
+        for block in blocks:
+            block_type = block.get("type")
+            overflow_children = None
+            
+            # Legacy table rows are sent inline as regular table children
+            if block_type == "table" and "_table_children" in block:
+                block["table"]["children"] = block.pop("_table_children")
+            
+            # Notion accepts nested children inline (up to 100 per parent), so only
+            # the overflow beyond that needs a follow-up append. Blocks are built
+            # fresh by convert_markdown_to_blocks, so they are trimmed in place.
+            if block_type and block_type in block:
+                children = block[block_type].get("children")
+                if children and len(children) > MAX_CHILDREN_PER_REQUEST:
+                    block[block_type]["children"] = children[:MAX_CHILDREN_PER_REQUEST]
+                    overflow_children = children[MAX_CHILDREN_PER_REQUEST:]
+            
+            # Close the batch at 100 top-level blocks, or earlier if the inline
+            # children would push the request past 1,000 blocks in total
+            block_count = self.count_blocks(block)
+            if batch and (len(batch) == MAX_CHILDREN_PER_REQUEST or batch_block_count + block_count > MAX_BLOCKS_PER_REQUEST):
+                # Later batches would land out of place after a gap, so stop at the first failure
+                if not self.append_block_batch(page_id, batch, children_to_process):
+                    return False
+                batch = []
+                batch_block_count = 0
+                children_to_process = []
+            
+            if overflow_children:
+                children_to_process.append((len(batch), overflow_children))
+            batch.append(block)
+            batch_block_count += block_count
+        
+        if batch:
+            return self.append_block_batch(page_id, batch, children_to_process)
+        
+        return True
+    
+    def append_block_batch(self, page_id: str, batch: List[Dict], children_to_process: List[Tuple[int, List[Dict]]]) -> bool:
+        """Append one batch of top-level blocks, then any overflow children. Returns True on success."""
+        try:
+            # Add parent blocks together with their children
+            response = notion.blocks.children.append(
+                block_id=page_id,
+                children=batch
+            )
             
-            # Separate children from parent blocks for API call
-            children_to_process = {}
-            table_children_to_process = {}
-            clean_batch = []
+            # Add any overflow children to their parent blocks. Different parents
+            # are filled concurrently; chunks for one parent stay in order.
+            if "results" in response and children_to_process:
+                tasks = [
+                    (response["results"][batch_idx]["id"], children)
+                    for batch_idx, children in children_to_process
+                    if batch_idx < len(response["results"])
+                ]
+                list(append_executor.map(lambda task: self.append_children(task[0], task[1], MAX_CHILDREN_PER_REQUEST), tasks))
             
-            for idx, block in enumerate(batch):
-                block_copy = block.copy()
-                block_type = block_copy.get("type")
-                
-                # Handle table children separately
-                if block_type == "table" and "_table_children" in block_copy:
-                    table_children = block_copy.pop("_table_children", [])
-                    table_children_to_process[idx] = table_children
-                
-                # Check for children in various block types (exclude tables as they handle children differently)
-                if block_type and block_type in block_copy and block_type != "table":
-                    if "children" in block_copy[block_type]:
-                        children = block_copy[block_type].pop("children", [])
-                        children_to_process[idx] = children
-                
-                clean_batch.append(block_copy)
+            return True
             
-            try:
-                # Add parent blocks first
-                response = notion.blocks.children.append(
-                    block_id=page_id,
-                    children=clean_batch
-                )
-                
-                # Add children to their parent blocks
-                if "results" in response:
-                    # Handle regular children
-                    if children_to_process:
-                        for batch_idx, children in children_to_process.items():
-                            if batch_idx < len(response["results"]):
-                                parent_block_id = response["results"][batch_idx]["id"]
-                                notion.blocks.children.append(
-                                    block_id=parent_block_id,
-                                    children=children
-                                )
-                    
-                    # Handle table children
-                    if table_children_to_process:
-                        for batch_idx, table_children in table_children_to_process.items():
-                            if batch_idx < len(response["results"]):
-                                table_block_id = response["results"][batch_idx]["id"]
-                                notion.blocks.children.append(
-                                    block_id=table_block_id,
-                                    children=table_children
-                                )
-                
-            except Exception as e:
-                logger.error(f"Error adding blocks to page {page_id}: {e}")
+        except Exception as e:
+            logger.error(f"Error adding blocks to page {page_id}: {e}")
+            return False
+
+def ensure_content_hash_property():
+    """Add the Content Hash property to the database if it does not exist yet."""
+    try:
+        database = notion.databases.retrieve(database_id=DATABASE_ID)
+        
+        if "Content Hash" not in database.get("properties", {}):
+            notion.databases.update(
+                database_id=DATABASE_ID,
+                properties={"Content Hash": {"rich_text": {}}}
+            )
+            logger.info("Added 'Content Hash' property to database")
+            
+    except Exception as e:
+        logger.error(f"Error ensuring Content Hash property: {e}")
+
+def load_migrator_cache(migrator):
+    """Restore section configs saved by a previous run, if the cache is still fresh."""
+    if not MIGRATOR_CACHE_FILE.exists():
+        return
+    
+    cache_age = time.time() - MIGRATOR_CACHE_FILE.stat().st_mtime
+    if cache_age > MIGRATOR_CACHE_TTL_SECONDS:
+        logger.info(f"Migrator cache is {cache_age / 60:.0f} minutes old, ignoring it")
+        return
+    
+    try:
+        with open(MIGRATOR_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        migrator.sections.update(cache.get("sections", {}))
+        logger.info(f"Loaded {len(migrator.sections)} section configs from {MIGRATOR_CACHE_FILE}")
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not read migrator cache {MIGRATOR_CACHE_FILE}: {e}")
+
+def save_migrator_cache(migrator):
+    """Save section configs so the next run can skip the Gitea config fetches."""
+    try:
+        with open(MIGRATOR_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"sections": migrator.sections}, f, ensure_ascii=False, default=str)
+    except OSError as e:
+        logger.warning(f"Could not write migrator cache {MIGRATOR_CACHE_FILE}: {e}")
 
 def load_test_articles():
     """Load test articles from file."""
@@ -997,11 +1292,36 @@ def load_test_articles():
         return []
 
 def discover_all_articles(migrator):
-    """Discover all articles from all sections by scanning the filesystem."""
+    """Discover all articles from all sections using a single Gitea tree listing."""
     all_articles = []
     
-    # Known sections - scan the local en_ta directory
+    # Known sections
     sections_to_check = ['intro', 'translate', 'process', 'checking']
+    
+    tree_paths = migrator.list_gitea_tree()
+    if tree_paths is None:
+        logger.warning("Gitea tree listing failed, falling back to local en_ta checkout")
+        return discover_local_articles(sections_to_check)
+    
+    articles_by_section = {section_name: [] for section_name in sections_to_check}
+    
+    # Article paths look like "<section>/<article>/01.md"
+    for path in tree_paths:
+        parts = path.split('/')
+        if len(parts) == 3 and parts[2] == '01.md' and parts[0] in articles_by_section:
+            articles_by_section[parts[0]].append(parts[1])
+    
+    for section_name in sections_to_check:
+        articles_found = articles_by_section[section_name]
+        all_articles.extend(f"{section_name}/{article_name}" for article_name in articles_found)
+        logger.info(f"Found {len(articles_found)} articles in {section_name} section")
+    
+    logger.info(f"Discovered {len(all_articles)} total articles")
+    return all_articles
+
+def discover_local_articles(sections_to_check: List[str]) -> List[str]:
+    """Discover articles by scanning the local en_ta directory."""
+    all_articles = []
     base_path = Path('en_ta')
     
     for section_name in sections_to_check:
@@ -1013,19 +1333,9 @@ def discover_all_articles(migrator):
                 logger.warning(f"Section path {section_path} does not exist")
                 continue
             
-            articles_found = []
-            
-            # Scan all subdirectories in the section
-            for item in section_path.iterdir():
-                if item.is_dir() and item.name not in ['config.yaml', 'toc.yaml']:
-                    # Check if this directory contains an 01.md file
-                    article_file = item / '01.md'
-                    if article_file.exists():
-                        article_name = item.name
-                        articles_found.append(article_name)
-                        article_path = f"{section_name}/{article_name}"
-                        all_articles.append(article_path)
-                        logger.info(f"Found article: {article_path}")
+            # One directory sweep per section for article folders containing 01.md
+            articles_found = sorted(article_file.parent.name for article_file in section_path.glob('*/01.md'))
+            all_articles.extend(f"{section_name}/{article_name}" for article_name in articles_found)
             
             logger.info(f"Found {len(articles_found)} articles in {section_name} section")
             
@@ -1042,17 +1352,29 @@ def main():
                        help='Run with test articles from test_articles.txt')
     parser.add_argument('--all', action='store_true', 
                        help='Run with all discovered articles (default)')
+    parser.add_argument('--refresh-cache', action='store_true',
+                       help='Ignore cached section configs and re-fetch them from Gitea')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Log per-article details (page lookups, block counts, URLs)')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-migrate every article even if its Content Hash is unchanged (e.g. after converter changes)')
     
     args = parser.parse_args()
     
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
     # Default to --all if no option specified
     if not args.test and not args.all:
         args.all = True
     
-    migrator = FinalFixedTAMigrator()
+    migrator = FinalFixedTAMigrator(force=args.force)
     
     logger.info("Starting final fixed Translation Academy migration...")
     
+    if not args.refresh_cache:
+        load_migrator_cache(migrator)
+    
     # Determine which articles to process
     if args.test:
         logger.info("Running in TEST mode with articles from test_articles.txt")
@@ -1061,68 +1383,61 @@ def main():
         logger.info("Running in ALL mode - discovering all articles")
         articles_list = discover_all_articles(migrator)
     
-    logger.info(f"Processing {len(articles_list)} articles in batches...")
+    logger.info(f"Processing {len(articles_list)} articles with {MAX_WORKERS} workers...")
     
-    # Process articles in batches
-    batch_size = 5  # Process 5 articles at a time
-    success_count = 0
     total_articles = len(articles_list)
     
-    # Load section configurations once
-    sections_loaded = set()
+    ensure_content_hash_property()
     
-    for i in range(0, total_articles, batch_size):
-        batch = articles_list[i:i + batch_size]
-        batch_start = i + 1
-        batch_end = min(i + batch_size, total_articles)
-        
-        logger.info(f"Processing batch {batch_start}-{batch_end} of {total_articles} articles...")
+    # Load section configurations once, before workers start sharing the migrator
+    sections_fetched = False
+    for section_name in sorted({article_key.split('/', 1)[0] for article_key in articles_list}):
+        if section_name not in migrator.sections:
+            logger.info(f"Loading {section_name} section configuration...")
+            migrator.sections[section_name] = migrator.load_config_from_gitea(section_name)
+            sections_fetched = True
+    
+    # Only rewrite the cache when something new was fetched, so its age stays meaningful
+    if sections_fetched:
+        save_migrator_cache(migrator)
+    
+    def process_one(article_num: int, article_key: str) -> bool:
+        """Load, convert and upload a single article. Returns True on success."""
+        logger.info(f"Processing ({article_num}/{total_articles}): {article_key}")
         
-        for j, article_key in enumerate(batch):
-            article_num = i + j + 1
-            logger.info(f"Processing ({article_num}/{total_articles}): {article_key}")
+        try:
+            section_name, article_name = article_key.split('/', 1)
             
-            try:
-                section_name, article_name = article_key.split('/', 1)
-                
-                # Load section configuration if not already loaded
-                if section_name not in sections_loaded:
-                    logger.info(f"Loading {section_name} section configuration...")
-                    if section_name not in migrator.sections:
-                        migrator.sections[section_name] = migrator.load_config_from_gitea(section_name)
-                    sections_loaded.add(section_name)
-                
-                # Load article data
-                article_data = migrator.load_article_from_gitea(section_name, article_name)
-                if not article_data['content']:
-                    logger.warning(f"  No content found for {article_key}")
-                    continue
-                
-                logger.info(f"  Title: {article_data['title']}")
-                
-                # Get relationships for this article
-                relationships = migrator.get_article_relationships(section_name, article_name)
-                
-                # Create or update the database entry
-                page_id = migrator.create_or_update_database_entry(article_data, relationships, article_num)
-                
-                if page_id:
-                    success_count += 1
-                    logger.info(f"  Created page: https://www.notion.so/{page_id.replace('-', '')}")
-                else:
-                    logger.error(f"  Failed to create page for {article_key}")
-                
-                # Rate limiting between articles
-                time.sleep(0.3)
-                
-            except Exception as e:
-                logger.error(f"  Error processing {article_key}: {str(e)}")
-                continue
-        
-        # Longer pause between batches to be respectful to APIs
-        if batch_end < total_articles:
-            logger.info(f"Batch {batch_start}-{batch_end} complete. Pausing before next batch...")
-            time.sleep(2)
+            # Load article data
+            article_data = migrator.load_article_from_gitea(section_name, article_name)
+            if not article_data['content']:
+                logger.warning(f"  No content found for {article_key}")
+                return False
+            
+            logger.debug(f"  Title: {article_data['title']}")
+            
+            # Get relationships for this article
+            relationships = migrator.get_article_relationships(section_name, article_name)
+            
+            # Create or update the database entry
+            page_id = migrator.create_or_update_database_entry(article_data, relationships, article_num)
+            
+            if page_id:
+                logger.debug(f"  Created page: https://www.notion.so/{page_id.replace('-', '')}")
+                return True
+            
+            logger.error(f"  Failed to create page for {article_key}")
+            return False
+            
+        except Exception as e:
+            logger.error(f"  Error processing {article_key}: {str(e)}")
+            return False
+    
+    # Notion calls are throttled by rate_limited, so no fixed sleeps are needed here
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(process_one, range(1, total_articles + 1), articles_list))
+    
+    success_count = sum(results)
     
     logger.info(f"Final fixed migration complete: {success_count}/{total_articles} successful")
 
@@ -2,10 +2,13 @@ import os
 import re
 import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import requests
-import base64
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from notion_client import Client
+from notion_rate_limit import notion_limiter
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,6 +27,15 @@ logger = logging.getLogger()
 notion = Client(auth=os.environ.get("NOTION_API_KEY"))
 gitea_api_key = os.environ.get("GITEA_API_KEY")
 
+# Shared Gitea session so connections are kept alive between requests
+gitea_session = requests.Session()
+gitea_session.headers.update({"Authorization": f"token {gitea_api_key}"})
+gitea_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+))
+
 # Gitea API base URL
 GITEA_API_BASE = "https://git.door43.org/api/v1"
 REPO_OWNER = "unfoldingWord"
@@ -33,67 +45,73 @@ REPO_NAME = "en_ta"
 NOTION_PARENT_ID = os.environ.get("NOTION_PARENT_ID", "1c372d5a-f2de-80e0-8b11-cd7748a1467d")
 
 def fetch_gitea_content(article_folder, file_path):
-    """Fetch content from Gitea API."""
-    endpoint = f"{GITEA_API_BASE}/repos/{REPO_OWNER}/{REPO_NAME}/contents/translate/{article_folder}/{file_path}"
-    headers = {"Authorization": f"token {gitea_api_key}"}
+    """Fetch raw file content from Gitea API."""
+    # The raw endpoint returns the file bytes directly (no JSON/base64 wrapping)
+    endpoint = f"{GITEA_API_BASE}/repos/{REPO_OWNER}/{REPO_NAME}/raw/translate/{article_folder}/{file_path}"
     
     try:
-        response = requests.get(endpoint, headers=headers)
+        response = gitea_session.get(endpoint, timeout=10)
         response.raise_for_status()
-        content_data = response.json()
-        if 'content' in content_data:
-            content = base64.b64decode(content_data['content']).decode('utf-8')
-            return content
-        else:
-            logger.error(f"No content found for {article_folder}/{file_path}")
-            return None
+        return response.content.decode('utf-8')
     except requests.RequestException as e:
         logger.error(f"Error fetching {article_folder}/{file_path}: {str(e)}")
         return None
 
-def preprocess_markdown(markdown_content):
-    """Preprocess markdown content to handle formatting cases Notion doesn't support."""
-    # Function to convert to unicode superscript characters
-    def convert_to_unicode_superscript(match):
-        text = match.group(1)
-        superscript_map = {
-            '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
-            '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹',
-            'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ',
-            'f': 'ᶠ', 'g': 'ᵍ', 'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ',
-            'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ', 'o': 'ᵒ',
-            'p': 'ᵖ', 'q': 'ᵠ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ',
-            'u': 'ᵘ', 'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ',
-            'z': 'ᶻ', 'A': 'ᴬ', 'B': 'ᴮ', 'C': 'ᶜ', 'D': 'ᴰ',
-            'E': 'ᴱ', 'F': 'ᶠ', 'G': 'ᴳ', 'H': 'ᴴ', 'I': 'ᴵ',
-            'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ', 'M': 'ᴹ', 'N': 'ᴺ',
-            'O': 'ᴼ', 'P': 'ᴾ', 'Q': 'ᵠ', 'R': 'ᴿ', 'S': 'ˢ',
-            'T': 'ᵀ', 'U': 'ᵁ', 'V': 'ⱽ', 'W': 'ᵂ', 'X': 'ˣ',
-            'Y': 'ʸ', 'Z': 'ᶻ', '+': '⁺', '-': '⁻', '=': '⁼',
-            '(': '⁽', ')': '⁾', '[': '⁽', ']': '⁾'
-        }
-        result = ""
-        for char in text:
-            if char in superscript_map:
-                result += superscript_map[char]
-            else:
-                result += char  # Keep as is if no superscript equivalent
-        return result
+# Unicode superscript mapping, built once and applied with str.translate
+SUPERSCRIPT_MAP = {
+    '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
+    '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹',
+    'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ',
+    'f': 'ᶠ', 'g': 'ᵍ', 'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ',
+    'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ', 'o': 'ᵒ',
+    'p': 'ᵖ', 'q': 'ᵠ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ',
+    'u': 'ᵘ', 'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ',
+    'z': 'ᶻ', 'A': 'ᴬ', 'B': 'ᴮ', 'C': 'ᶜ', 'D': 'ᴰ',
+    'E': 'ᴱ', 'F': 'ᶠ', 'G': 'ᴳ', 'H': 'ᴴ', 'I': 'ᴵ',
+    'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ', 'M': 'ᴹ', 'N': 'ᴺ',
+    'O': 'ᴼ', 'P': 'ᴾ', 'Q': 'ᵠ', 'R': 'ᴿ', 'S': 'ˢ',
+    'T': 'ᵀ', 'U': 'ᵁ', 'V': 'ⱽ', 'W': 'ᵂ', 'X': 'ˣ',
+    'Y': 'ʸ', 'Z': 'ᶻ', '+': '⁺', '-': '⁻', '=': '⁼',
+    '(': '⁽', ')': '⁾', '[': '⁽', ']': '⁾'
+}
+SUPERSCRIPT_TABLE = str.maketrans(SUPERSCRIPT_MAP)
+
+# Single preprocessing pattern covering escaped brackets, footnote markers,
+# <sup> tags and ^{} notation so the content is scanned only once
+PREPROCESS_PATTERN = re.compile(
+    r'\\\[(?P<escaped>.*?)\\\]'
+    r'|\[(?P<footnote>\d+)\]'
+    r'|<sup>(?P<sup>.*?)</sup>'
+    r'|\^\{(?P<caret>.*?)\}'
+)
+
+def convert_to_unicode_superscript(text):
+    """Convert text to unicode superscript characters."""
+    # Characters without a superscript equivalent are kept as is
+    return text.translate(SUPERSCRIPT_TABLE)
 
-    # 1. Handle escaped brackets like \[text\]
-    markdown_content = re.sub(r'\\\[(.*?)\\\]', r'[\1]', markdown_content)
+def replace_preprocess_match(match):
+    """Rewrite one PREPROCESS_PATTERN match."""
+    kind = match.lastgroup
     
-    # 2. Handle specific footnote pattern like: > 53 \[Then everyone... [2]\]
-    # This converts the footnote marker [2] to superscript ²
-    markdown_content = re.sub(r'\[([\d]+)\]', lambda m: convert_to_unicode_superscript(m), markdown_content)
+    if kind == 'footnote':
+        # Footnote marker like [2] becomes superscript ²
+        return convert_to_unicode_superscript(match.group('footnote'))
     
-    # 3. Handle superscript tags <sup>text</sup> and convert to proper unicode superscript
-    markdown_content = re.sub(r'<sup>(.*?)</sup>', convert_to_unicode_superscript, markdown_content)
+    # Nested markup inside the match is handled first
+    inner = PREPROCESS_PATTERN.sub(replace_preprocess_match, match.group(kind))
     
-    # 4. Apply superscript conversion for ^{} notation
-    markdown_content = re.sub(r'\^\{(.*?)\}', convert_to_unicode_superscript, markdown_content)
+    if kind == 'escaped':
+        # Escaped brackets \[text\] become [text]; an escaped number is a footnote marker
+        return convert_to_unicode_superscript(inner) if inner.isdecimal() else f"[{inner}]"
     
-    return markdown_content
+    # <sup>text</sup> and ^{text} become unicode superscript
+    return convert_to_unicode_superscript(inner)
+
+def preprocess_markdown(markdown_content):
+    """Preprocess markdown content to handle formatting cases Notion doesn't support."""
+    # Handles \[text\], footnote markers like [2], <sup>text</sup> and ^{text} in one pass
+    return PREPROCESS_PATTERN.sub(replace_preprocess_match, markdown_content)
 
 def create_page_with_markdown(title, content, add_metadata=None):
     """Create a page in Notion using a markdown block."""
@@ -193,20 +211,18 @@ def create_page_with_markdown(title, content, add_metadata=None):
         logger.error(f"Error creating page with markdown: {str(e)}")
         return None
 
-def main():
-    parser = argparse.ArgumentParser(description="Create Notion page with markdown content")
-    parser.add_argument("--article", required=True, help="Article ID to fetch and create")
-    args = parser.parse_args()
-    
-    # Fetch article content
-    article_id = args.article
-    title_content = fetch_gitea_content(article_id, "title.md")
-    subtitle_content = fetch_gitea_content(article_id, "sub-title.md")
-    article_content = fetch_gitea_content(article_id, "01.md")
+def migrate_article(article_id):
+    """Fetch one article and create its Notion page. Returns the page ID or None."""
+    # The three files are independent, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        title_content, subtitle_content, article_content = executor.map(
+            lambda file_path: fetch_gitea_content(article_id, file_path),
+            ["title.md", "sub-title.md", "01.md"]
+        )
     
     if not title_content or not article_content:
         logger.error(f"Failed to fetch content for {article_id}")
-        return
+        return None
     
     # Clean up content
     title = title_content.strip()
@@ -218,12 +234,26 @@ def main():
     }
     
     # Create the page with markdown content
+    notion_limiter.acquire()
     page_id = create_page_with_markdown(title, article_content, metadata)
     
     if page_id:
         logger.info(f"Successfully created page for '{title}' with ID: {page_id}")
     else:
         logger.error(f"Failed to create page for '{title}'")
+    
+    return page_id
+
+def main():
+    parser = argparse.ArgumentParser(description="Create Notion pages with markdown content")
+    parser.add_argument("--article", required=True, nargs='+', help="Article ID(s) to fetch and create")
+    args = parser.parse_args()
+    
+    # Process several articles in one run to share the Notion client and Gitea session
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        page_ids = list(executor.map(migrate_article, args.article))
+    
+    logger.info(f"Created {sum(1 for page_id in page_ids if page_id)}/{len(args.article)} pages")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
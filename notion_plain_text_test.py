@@ -4,7 +4,8 @@ import logging
 import argparse
 from dotenv import load_dotenv
 import requests
-import base64
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from notion_client import Client
 
 # Load environment variables from .env file
@@ -24,82 +25,164 @@ logger = logging.getLogger()
 notion = Client(auth=os.environ.get("NOTION_API_KEY"))
 gitea_api_key = os.environ.get("GITEA_API_KEY")
 
+# Shared Gitea session so connections are kept alive between requests
+gitea_session = requests.Session()
+gitea_session.headers.update({
+    "Authorization": f"token {gitea_api_key}"
+})
+gitea_session.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=5, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+))
+
 # Gitea API base URL
 GITEA_API_BASE = "https://git.door43.org/api/v1"
 REPO_OWNER = "unfoldingWord"
 REPO_NAME = "en_ta"
 
+# Maximum number of child blocks Notion accepts in a single request
+MAX_CHILDREN_PER_REQUEST = 100
+
 # Notion parent page ID (where to create content)
 NOTION_PARENT_ID = os.environ.get("NOTION_PARENT_ID", "1c372d5a-f2de-80e0-8b11-cd7748a1467d")
 
 def fetch_gitea_content(article_folder, file_path):
-    """Fetch content from Gitea API."""
-    endpoint = f"{GITEA_API_BASE}/repos/{REPO_OWNER}/{REPO_NAME}/contents/translate/{article_folder}/{file_path}"
-    headers = {"Authorization": f"token {gitea_api_key}"}
+    """Fetch raw file content from Gitea API."""
+    # The raw endpoint returns the file bytes directly (no JSON/base64 wrapping)
+    endpoint = f"{GITEA_API_BASE}/repos/{REPO_OWNER}/{REPO_NAME}/raw/translate/{article_folder}/{file_path}"
     
     try:
-        response = requests.get(endpoint, headers=headers)
+        response = gitea_session.get(endpoint, timeout=30)
         response.raise_for_status()
-        content_data = response.json()
-        if 'content' in content_data:
-            content = base64.b64decode(content_data['content']).decode('utf-8')
-            return content
-        else:
-            logger.error(f"No content found for {article_folder}/{file_path}")
-            return None
+        return response.content.decode('utf-8')
     except requests.RequestException as e:
         logger.error(f"Error fetching {article_folder}/{file_path}: {str(e)}")
         return None
 
+# Unicode superscript mapping, built once and applied with str.translate
+SUPERSCRIPT_MAP = {
+    '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
+    '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹',
+    'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ',
+    'f': 'ᶠ', 'g': 'ᵍ', 'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ',
+    'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ', 'o': 'ᵒ',
+    'p': 'ᵖ', 'q': 'ᵠ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ',
+    'u': 'ᵘ', 'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ',
+    'z': 'ᶻ', 'A': 'ᴬ', 'B': 'ᴮ', 'C': 'ᶜ', 'D': 'ᴰ',
+    'E': 'ᴱ', 'F': 'ᶠ', 'G': 'ᴳ', 'H': 'ᴴ', 'I': 'ᴵ',
+    'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ', 'M': 'ᴹ', 'N': 'ᴺ',
+    'O': 'ᴼ', 'P': 'ᴾ', 'Q': 'ᵠ', 'R': 'ᴿ', 'S': 'ˢ',
+    'T': 'ᵀ', 'U': 'ᵁ', 'V': 'ⱽ', 'W': 'ᵂ', 'X': 'ˣ',
+    'Y': 'ʸ', 'Z': 'ᶻ', '+': '⁺', '-': '⁻', '=': '⁼',
+    '(': '⁽', ')': '⁾', '[': '⁽', ']': '⁾'
+}
+SUPERSCRIPT_TABLE = str.maketrans(SUPERSCRIPT_MAP)
+
+# Preprocessing patterns, compiled once at import
+ESCAPED_BRACKETS_PATTERN = re.compile(r'\\\[(.*?)\\\]')
+FOOTNOTE_MARKER_PATTERN = re.compile(r'\[([\d]+)\]')
+SUP_TAG_PATTERN = re.compile(r'<sup>(.*?)</sup>')
+CARET_BRACE_PATTERN = re.compile(r'\^\{(.*?)\}')
+
+def convert_to_unicode_superscript(match):
+    """Convert the first group of a regex match to unicode superscript characters."""
+    # Characters without a superscript equivalent are kept as is
+    return match.group(1).translate(SUPERSCRIPT_TABLE)
+
 def preprocess_markdown(markdown_content):
     """Preprocess markdown content to handle formatting cases Notion doesn't support."""
-    # Function to convert to unicode superscript characters
-    def convert_to_unicode_superscript(match):
-        text = match.group(1)
-        superscript_map = {
-            '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
-            '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹',
-            'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ',
-            'f': 'ᶠ', 'g': 'ᵍ', 'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ',
-            'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ', 'o': 'ᵒ',
-            'p': 'ᵖ', 'q': 'ᵠ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ',
-            'u': 'ᵘ', 'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ',
-            'z': 'ᶻ', 'A': 'ᴬ', 'B': 'ᴮ', 'C': 'ᶜ', 'D': 'ᴰ',
-            'E': 'ᴱ', 'F': 'ᶠ', 'G': 'ᴳ', 'H': 'ᴴ', 'I': 'ᴵ',
-            'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ', 'M': 'ᴹ', 'N': 'ᴺ',
-            'O': 'ᴼ', 'P': 'ᴾ', 'Q': 'ᵠ', 'R': 'ᴿ', 'S': 'ˢ',
-            'T': 'ᵀ', 'U': 'ᵁ', 'V': 'ⱽ', 'W': 'ᵂ', 'X': 'ˣ',
-            'Y': 'ʸ', 'Z': 'ᶻ', '+': '⁺', '-': '⁻', '=': '⁼',
-            '(': '⁽', ')': '⁾', '[': '⁽', ']': '⁾'
-        }
-        result = ""
-        for char in text:
-            if char in superscript_map:
-                result += superscript_map[char]
-            else:
-                result += char  # Keep as is if no superscript equivalent
-        return result
-
     # 1. Handle escaped brackets like \[text\]
-    markdown_content = re.sub(r'\\\[(.*?)\\\]', r'[\1]', markdown_content)
+    markdown_content = ESCAPED_BRACKETS_PATTERN.sub(r'[\1]', markdown_content)
     
     # 2. Handle specific footnote pattern like: > 53 \[Then everyone... [2]\]
     # This converts the footnote marker [2] to superscript ²
-    markdown_content = re.sub(r'\[([\d]+)\]', lambda m: convert_to_unicode_superscript(m), markdown_content)
+    markdown_content = FOOTNOTE_MARKER_PATTERN.sub(convert_to_unicode_superscript, markdown_content)
     
     # 3. Handle superscript tags <sup>text</sup> and convert to proper unicode superscript
-    markdown_content = re.sub(r'<sup>(.*?)</sup>', convert_to_unicode_superscript, markdown_content)
+    markdown_content = SUP_TAG_PATTERN.sub(convert_to_unicode_superscript, markdown_content)
     
     # 4. Apply superscript conversion for ^{} notation
-    markdown_content = re.sub(r'\^\{(.*?)\}', convert_to_unicode_superscript, markdown_content)
+    markdown_content = CARET_BRACE_PATTERN.sub(convert_to_unicode_superscript, markdown_content)
     
     return markdown_content
 
+# Markdown line markers and the Notion block type each one becomes
+BLOCK_MARKERS = {
+    "#": "heading_1",
+    "##": "heading_2",
+    "###": "heading_3",
+    "*": "bulleted_list_item",
+    "-": "bulleted_list_item",
+    ">": "quote"
+}
+
+# Notion rejects rich text longer than 2000 characters; stay slightly below it
+MAX_CHARS = 1900
+
+def split_long_text(text, max_chars=MAX_CHARS):
+    """Yield chunks of at most max_chars, breaking on whitespace where possible."""
+    start = 0
+    length = len(text)
+    
+    while start < length:
+        end = min(start + max_chars, length)
+        
+        # Back up to the last space in the second half of the chunk so words stay whole
+        if end < length:
+            space = text.rfind(" ", start + max_chars // 2, end)
+            if space > start:
+                end = space
+        
+        yield text[start:end]
+        start = end
+
+def iter_blocks(content):
+    """Yield (block_type, text) for each paragraph of markdown content."""
+    # Paragraphs are separated by double newlines
+    for para in content.split("\n\n"):
+        stripped = para.strip()
+        
+        # Skip empty paragraphs
+        if not stripped:
+            continue
+        
+        # The marker is everything before the first space, e.g. "##" in "## Title"
+        marker, separator, text = stripped.partition(" ")
+        block_type = BLOCK_MARKERS.get(marker) if separator else None
+        
+        if block_type == "bulleted_list_item":
+            # Each bullet line of a list paragraph becomes its own item
+            for line in stripped.split("\n"):
+                line = line.strip()
+                if line.startswith(("* ", "- ")):
+                    yield block_type, line[2:]
+        elif block_type:
+            yield block_type, text
+        else:
+            # Regular paragraph, split into chunks if it is too long
+            for chunk in split_long_text(para):
+                yield "paragraph", chunk
+
+def make_block(block_type, content):
+    """Build a Notion block of the given type holding a single text run."""
+    return {
+        "object": "block",
+        "type": block_type,
+        block_type: {
+            "rich_text": [{"type": "text", "text": {"content": content}}]
+        }
+    }
+
 def create_page_with_plain_text(title, content):
     """Create a page in Notion using plain text content."""
     # Preprocess the content
     processed_content = preprocess_markdown(content)
     
+    # Start with a title heading, then classify the content in one pass
+    children = [make_block("heading_1", title)]
+    children.extend(make_block(block_type, text) for block_type, text in iter_blocks(processed_content))
+    
     # Create a new page with plain text content
     page_data = {
         "parent": {"page_id": NOTION_PARENT_ID},
@@ -113,158 +196,23 @@ def create_page_with_plain_text(title, content):
                     }
                 ]
             }
-        },
-        "children": [
-            {
-                "object": "block",
-                "type": "heading_1",
-                "heading_1": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": title
-                            }
-                        }
-                    ]
-                }
-            }
-        ]
+        }
     }
     
-    # Split content into paragraphs (by double newlines)
-    paragraphs = processed_content.split("\n\n")
-    
-    # Create a paragraph block for each paragraph, splitting long paragraphs if needed
-    for para in paragraphs:
-        # Skip empty paragraphs
-        if not para.strip():
-            continue
-            
-        # Handle markdown headers - convert to appropriate heading blocks
-        if para.strip().startswith("# "):
-            page_data["children"].append({
-                "object": "block",
-                "type": "heading_1",
-                "heading_1": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": para.strip()[2:]  # Remove the "# "
-                            }
-                        }
-                    ]
-                }
-            })
-        elif para.strip().startswith("## "):
-            page_data["children"].append({
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": para.strip()[3:]  # Remove the "## "
-                            }
-                        }
-                    ]
-                }
-            })
-        elif para.strip().startswith("### "):
-            page_data["children"].append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": para.strip()[4:]  # Remove the "### "
-                            }
-                        }
-                    ]
-                }
-            })
-        # Handle bullet lists
-        elif para.strip().startswith("* ") or para.strip().startswith("- "):
-            lines = para.strip().split("\n")
-            for line in lines:
-                if line.strip().startswith("* ") or line.strip().startswith("- "):
-                    page_data["children"].append({
-                        "object": "block",
-                        "type": "bulleted_list_item",
-                        "bulleted_list_item": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {
-                                        "content": line.strip()[2:]  # Remove the "* " or "- "
-                                    }
-                                }
-                            ]
-                        }
-                    })
-        # Handle block quotes
-        elif para.strip().startswith("> "):
-            page_data["children"].append({
-                "object": "block",
-                "type": "quote",
-                "quote": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": para.strip()[2:]  # Remove the "> "
-                            }
-                        }
-                    ]
-                }
-            })
-        # Regular paragraph
-        else:
-            # If paragraph is too long, split it into chunks of 2000 chars
-            MAX_CHARS = 1900  # Slightly less than 2000 to be safe
-            
-            if len(para) <= MAX_CHARS:
-                page_data["children"].append({
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {
-                                    "content": para
-                                }
-                            }
-                        ]
-                    }
-                })
-            else:
-                # Split paragraph into chunks
-                chunks = [para[i:i+MAX_CHARS] for i in range(0, len(para), MAX_CHARS)]
-                for chunk in chunks:
-                    page_data["children"].append({
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {
-                                        "content": chunk
-                                    }
-                                }
-                            ]
-                        }
-                    })
+    # Notion accepts at most 100 children per request, so the page is created with
+    # the first batch and the remaining blocks are appended afterwards
+    batches = [children[i:i+MAX_CHILDREN_PER_REQUEST] for i in range(0, len(children), MAX_CHILDREN_PER_REQUEST)]
+    page_data["children"] = batches[0]
     
     try:
         response = notion.pages.create(**page_data)
-        logger.info(f"Created page '{title}' with plain text content")
-        return response["id"]
+        page_id = response["id"]
+        
+        for batch in batches[1:]:
+            notion.blocks.children.append(block_id=page_id, children=batch)
+        
+        logger.info(f"Created page '{title}' with plain text content ({len(children)} blocks)")
+        return page_id
     except Exception as e:
         logger.error(f"Error creating page with plain text: {str(e)}")
         return None
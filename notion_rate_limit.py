@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Shared Notion rate limiting for the import and link scripts.
+
+One token bucket per process keeps every Notion call under the API rate limit,
+and rate_limited retries calls that Notion answers with 429.
+"""
+
+import time
+import logging
+import functools
+import threading
+from typing import Optional
+from notion_client import APIResponseError
+
+logger = logging.getLogger(__name__)
+
+# Notion allows roughly 3 requests per second per integration
+NOTION_REQUESTS_PER_SECOND = 3
+# How many times a rate-limited Notion call is retried before giving up
+MAX_RATE_LIMIT_RETRIES = 5
+
+class RateLimiter:
+    """Thread-safe token bucket used to keep Notion calls under the rate limit."""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait_time = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait_time)
+
+notion_limiter = RateLimiter(NOTION_REQUESTS_PER_SECOND)
+
+def rate_limited(fn):
+    """Wrap a Notion endpoint so it waits for a token and honors 429 Retry-After."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(MAX_RATE_LIMIT_RETRIES):
+            notion_limiter.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except APIResponseError as e:
+                if e.status != 429 or attempt == MAX_RATE_LIMIT_RETRIES - 1:
+                    raise
+                # Honor Retry-After; without one, back off exponentially (1s, 2s, 4s, ...)
+                retry_after = float(getattr(e, "headers", {}).get("Retry-After", 2 ** attempt))
+                logger.warning(f"Rate limited by Notion, retrying in {retry_after}s")
+                time.sleep(retry_after)
+    return wrapper
+
+def rate_limit_endpoints(endpoints):
+    """Route each (endpoint, method name) pair through the shared limiter."""
+    # Methods the installed notion-client lacks (databases.query is gone in 3.x) are
+    # skipped, so importing a script never fails on an endpoint it may not call
+    for endpoint, method_name in endpoints:
+        if hasattr(endpoint, method_name):
+            setattr(endpoint, method_name, rate_limited(getattr(endpoint, method_name)))
@@ -1,10 +1,18 @@
 import os
 import re
-import time
 import logging
 import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from notion_client import Client
+from notion_rate_limit import rate_limit_endpoints
+
+# orjson parses and writes the cache file several times faster when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -18,16 +26,28 @@ logging.basicConfig(
 # Initialize Notion client
 notion = Client(auth=os.environ.get("NOTION_API_KEY"))
 
+# Pages whose links are updated concurrently
+MAX_WORKERS = 8
+
+# Back off only when Notion asks us to instead of sleeping after every update
+rate_limit_endpoints([
+    (notion.blocks, "update"),
+    (notion.blocks.children, "list"),
+])
+
 # Mapping from Gitea URLs to Notion page IDs
 url_to_page_id_map = {}
 # Cache for page IDs by title/article_id
 page_cache = {}
+# Every known link form (url_map entries plus synthesized article URLs) -> page ID
+url_index = {}
 
 def load_cache_from_file(filename="page_cache.json"):
     """Load page cache from a JSON file."""
     try:
-        with open(filename, 'r') as f:
-            data = json.load(f)
+        with open(filename, 'rb') as f:
+            raw = f.read()
+            data = orjson.loads(raw) if orjson else json.loads(raw)
             if "page_cache" in data:
                 global page_cache
                 page_cache = data["page_cache"]
@@ -36,53 +56,88 @@ def load_cache_from_file(filename="page_cache.json"):
                 global url_to_page_id_map
                 url_to_page_id_map = data["url_map"]
                 logging.info(f"Loaded {len(url_to_page_id_map)} URL mappings from {filename}")
+            build_url_index()
             return True
     except Exception as e:
         logging.error(f"Error loading cache from {filename}: {str(e)}")
         return False
 
+@functools.lru_cache(maxsize=None)
+def notion_page_url(page_id):
+    """Internal Notion URL for a page ID, formatted once per page."""
+    return f"https://www.notion.so/{page_id.replace('-', '')}"
+
+def build_url_index():
+    """Index every link form that resolves to a cached page so lookups are a single dict hit."""
+    global url_index
+    url_index = {}
+    
+    # Synthesize the relative and Gitea forms extract_article_id_from_link would resolve
+    for article_id, page_id in page_cache.items():
+        if not page_id or "/" in article_id or ":" in article_id:
+            continue
+        url_index[f"../{article_id}/01.md"] = page_id
+        url_index[f"../{article_id}/"] = page_id
+        url_index[f"https://git.door43.org/unfoldingWord/en_ta/src/branch/master/translate/{article_id}/01.md"] = page_id
+        url_index[f"https://git.door43.org/unfoldingWord/en_ta/src/branch/master/translate/{article_id}/"] = page_id
+    
+    # Explicit mappings take precedence over synthesized ones
+    url_index.update(url_to_page_id_map)
+
 def save_cache_to_file(filename="page_cache.json"):
     """Save page cache to a JSON file."""
     try:
-        with open(filename, 'w') as f:
-            json.dump({
-                "page_cache": page_cache,
-                "url_map": url_to_page_id_map
-            }, f, indent=2)
+        payload = {
+            "page_cache": page_cache,
+            "url_map": url_to_page_id_map
+        }
+        if orjson:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(payload, f, indent=2)
         logging.info(f"Saved {len(page_cache)} page cache entries and {len(url_to_page_id_map)} URL mappings to {filename}")
         return True
     except Exception as e:
         logging.error(f"Error saving cache to {filename}: {str(e)}")
         return False
 
+# Matches any substring a convertible link contains (Gitea URLs and relative article paths)
+LINK_HINT_PATTERN = re.compile(r'git\.door43\.org|\.\./|01\.md')
+
+def may_contain_convertible_link(raw_json):
+    """Cheap scan so blocks without candidate links skip per-link processing."""
+    return LINK_HINT_PATTERN.search(raw_json) is not None
+
+# Link patterns, compiled once at import
+RELATIVE_ARTICLE_PATTERN = re.compile(r'\.\./([^/]+)/01\.md')
+RELATIVE_FOLDER_PATTERN = re.compile(r'\.\./([^/]+)/')
+ARTICLE_FILE_PATTERN = re.compile(r'(\d+-[^/]+)\.md$')
+GITEA_ARTICLE_PATTERN = re.compile(r'translate/([^/]+)(?:/01\.md)?')
+
+@functools.lru_cache(maxsize=4096)
 def extract_article_id_from_link(link_url):
     """Extract article ID from an internal link."""
-    article_id = None
-    
-    # Check for the pattern ../folder/01.md or ../folder/
+    # The substring checks pick exactly one pattern, so at most one regex runs per link
     if "../" in link_url:
         # Pattern 1: ../folder/01.md
         if "01.md" in link_url:
-            match = re.search(r'\.\.\/([^\/]+)\/01\.md', link_url)
-            if match:
-                article_id = match.group(1)
+            pattern = RELATIVE_ARTICLE_PATTERN
         # Pattern 2: ../folder/
         elif link_url.endswith("/"):
-            match = re.search(r'\.\.\/([^\/]+)\/', link_url)
-            if match:
-                article_id = match.group(1)
+            pattern = RELATIVE_FOLDER_PATTERN
         # Additional pattern: 01-article-name.md
-        elif re.search(r'(\d+-[^\/]+)\.md$', link_url):
-            match = re.search(r'(\d+-[^\/]+)\.md$', link_url)
-            if match:
-                article_id = match.group(1)
+        else:
+            pattern = ARTICLE_FILE_PATTERN
     # Handle full URL paths
     elif "git.door43.org" in link_url and "translate/" in link_url:
-        match = re.search(r'translate/([^/]+)(?:/01\.md)?', link_url)
-        if match:
-            article_id = match.group(1)
+        pattern = GITEA_ARTICLE_PATTERN
+    else:
+        return None
     
-    return article_id
+    match = pattern.search(link_url)
+    return match.group(1) if match else None
 
 def update_page_links(page_id):
     """
@@ -109,6 +164,10 @@ def update_page_links(page_id):
             else:
                 break
         
+        # Most pages have no Gitea or relative links at all, so skip them outright
+        if not may_contain_convertible_link(json.dumps(blocks)):
+            return False
+        
         update_count = 0
         link_count = 0
         
@@ -137,7 +196,7 @@ def update_page_links(page_id):
             elif block_type == "quote":
                 rich_text = block.get("quote", {}).get("rich_text", [])
             
-            if not rich_text:
+            if not rich_text or not may_contain_convertible_link(json.dumps(rich_text)):
                 continue
                 
             # Check for links that need updating
@@ -158,9 +217,9 @@ def update_page_links(page_id):
                         # Try to find a matching page ID
                         matching_page_id = None
                         
-                        # Try exact match first
-                        if link_url in url_to_page_id_map:
-                            matching_page_id = url_to_page_id_map[link_url]
+                        # Try the prebuilt index first
+                        if link_url in url_index:
+                            matching_page_id = url_index[link_url]
                         # Then try variations
                         else:
                             # Check for article ID in the URL
@@ -171,7 +230,7 @@ def update_page_links(page_id):
                         if matching_page_id:
                             # Update the link to internal Notion link
                             updated_text_obj = text_obj.copy()
-                            updated_text_obj["text"]["link"]["url"] = f"https://www.notion.so/{matching_page_id.replace('-', '')}"
+                            updated_text_obj["text"]["link"]["url"] = notion_page_url(matching_page_id)
                             updated_rich_text.append(updated_text_obj)
                             modified = True
                             update_count += 1
@@ -197,8 +256,8 @@ def update_page_links(page_id):
                         }
                     }
                     
+                    # All link edits in this block go out in a single update
                     notion.blocks.update(block_id=block_id, **update_data)
-                    time.sleep(0.3)  # Avoid rate limiting
                 except Exception as update_err:
                     logging.error(f"Error updating block {block_id}: {str(update_err)}")
         
@@ -218,25 +277,21 @@ def process_all_pages():
     Uses the URL mapping and page cache.
     """
     logging.info(f"Starting link update process...")
-    logging.info(f"Found {len(page_cache)} pages in cache to process")
     
-    # Keep track of unique page IDs (since the cache maps both titles and IDs to page_ids)
-    processed_page_ids = set()
-    update_count = 0
+    # The cache maps both titles and IDs to page_ids, so collect each page once;
+    # gitea_content entries hold cached file text rather than page IDs
+    page_ids = {
+        page_id for key, page_id in page_cache.items()
+        if page_id and len(key) >= 3 and not key.startswith("gitea_content:")
+    }
+    logging.info(f"Found {len(page_ids)} unique pages in cache to process")
     
-    for key, page_id in page_cache.items():
-        # Skip non-page entries or already processed pages
-        if not page_id or page_id in processed_page_ids or len(key) < 3:
-            continue
-            
-        processed_page_ids.add(page_id)
-        
-        # Update links in this page
-        if update_page_links(page_id):
-            update_count += 1
-        
-        # Add a small delay to avoid rate limiting
-        time.sleep(0.3)
+    # Pages are independent and the work is HTTP-bound, so update them in parallel;
+    # the shared limiter keeps the total request rate under Notion's limit
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(update_page_links, page_ids))
+    
+    update_count = sum(results)
     
     logging.info(f"Link update process complete. Updated links in {update_count} pages.")
     return update_count > 0
@@ -38,6 +38,8 @@ notion = Client(auth=NOTION_API_KEY)
 def find_page_by_title(title: str):
     """Find a page in the database by title."""
     try:
+        # One filtered query: the script recovers a single article per run, so
+        # paging through the whole database to build an index would cost more
         response = notion.databases.query(
             database_id=DATABASE_ID,
             filter={
@@ -45,7 +47,8 @@ def find_page_by_title(title: str):
                 "title": {
                     "equals": title
                 }
-            }
+            },
+            page_size=1
         )
         
         if response["results"]:
@@ -150,14 +153,13 @@ def recover_page(article_path: str):
         page_id = page_info["page"]["id"]
         
         # Process the content and add blocks
-        blocks = migrator.process_markdown_content(content)
+        blocks = migrator.convert_markdown_to_blocks(content)
         
-        # Add blocks to the page
+        # Add blocks to the page, at most 100 per request (Notion's children limit)
         if blocks:
-            notion.blocks.children.append(
-                block_id=page_id,
-                children=blocks
-            )
+            if not migrator.add_blocks_to_page(page_id, blocks):
+                logger.error(f"Failed to add recovered blocks to page '{title}'")
+                return False
             
             logger.info(f"Successfully recovered page '{title}' with {len(blocks)} blocks")
             return True
@@ -11,16 +11,23 @@ import sys
 import re
 import time
 import logging
+import json
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
 from notion_client import Client
+from notion_rate_limit import rate_limit_endpoints
 
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler("replace_internal_links.log"),
+        logging.FileHandler("replace_internal_links.log", delay=True),
         logging.StreamHandler()
     ]
 )
@@ -33,80 +40,121 @@ load_dotenv()
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 DATABASE_ID = "340b5f5c4f574a6abd215e5b30aac26c"
 
-# Initialize Notion client
-notion = Client(auth=NOTION_API_KEY)
+# Pages found to have no internal links, keyed by page ID -> last_edited_time at scan
+LINK_SCAN_CACHE_FILE = Path("link_scan_cache.json")
+
+# Pages processed concurrently; the shared limiter caps the overall request rate
+MAX_WORKERS = 8
+
+# Initialize Notion client on a shared connection pool sized for the worker threads,
+# so every worker keeps its connection alive between requests
+notion = Client(
+    auth=NOTION_API_KEY,
+    client=httpx.Client(limits=httpx.Limits(
+        max_connections=MAX_WORKERS,
+        max_keepalive_connections=MAX_WORKERS
+    ))
+)
+
+# Route every Notion endpoint used by this script through the limiter
+rate_limit_endpoints([
+    (notion.databases, "query"),
+    (notion.blocks, "update"),
+    (notion.blocks.children, "list"),
+])
+
+# Block types whose content is a rich_text array that may hold links
+RICH_TEXT_BLOCK_TYPES = frozenset({
+    "paragraph", "heading_1", "heading_2", "heading_3",
+    "bulleted_list_item", "numbered_list_item", "quote", "callout", "toggle", "to_do"
+})
+
+# Path clean-up patterns, compiled once at import
+MULTI_SLASH_PATTERN = re.compile(r'/+')
+PARENT_DIR_PATTERN = re.compile(r'[^/]+/\.\./+')
 
 class LinkReplacer:
     def __init__(self):
         self.page_map = {}  # Maps article paths to page IDs
         self.updated_pages = 0
         self.total_links_replaced = 0
+        self.stats_lock = threading.Lock()  # Guards the counters across worker threads
+        self.link_scan_cache = {}  # page_id -> last_edited_time when no internal links were found
+        self.clean_page_ids = set()  # Pages this run found with nothing to replace
+        
+    def iter_database_pages(self):
+        """Yield every page in the database, one query batch at a time."""
+        start_cursor = None
         
+        while True:
+            if start_cursor:
+                response = notion.databases.query(
+                    database_id=DATABASE_ID,
+                    start_cursor=start_cursor,
+                    page_size=100
+                )
+            else:
+                response = notion.databases.query(database_id=DATABASE_ID, page_size=100)
+            
+            yield from response["results"]
+            
+            if not response["has_more"]:
+                break
+            
+            start_cursor = response["next_cursor"]
+    
     def load_page_mapping(self):
         """Load all pages and create a mapping from article paths to page IDs."""
         logger.info("Loading page mapping from database...")
         
         try:
-            all_pages = []
-            start_cursor = None
-            
-            while True:
-                if start_cursor:
-                    response = notion.databases.query(
-                        database_id=DATABASE_ID,
-                        start_cursor=start_cursor
-                    )
-                else:
-                    response = notion.databases.query(database_id=DATABASE_ID)
-                
-                all_pages.extend(response["results"])
-                
-                if not response["has_more"]:
-                    break
-                
-                start_cursor = response["next_cursor"]
+            page_count = 0
             
-            logger.info(f"Found {len(all_pages)} pages in database")
-            
-            # Build mapping from repository path to page ID
-            for page in all_pages:
-                repo_path = None
-                title = ""
+            # Build mapping from repository path to page ID as each batch arrives
+            for page in self.iter_database_pages():
+                page_count += 1
+                properties = page["properties"]
                 
                 # Get repository path
-                if "Repository Path" in page["properties"]:
-                    repo_prop = page["properties"]["Repository Path"]
-                    if repo_prop.get("rich_text"):
-                        repo_path = repo_prop["rich_text"][0]["plain_text"]
+                repo_path_text = properties.get("Repository Path", {}).get("rich_text")
+                if not repo_path_text:
+                    continue
+                
+                # Convert repo path to article key format
+                # e.g., "en_ta/translate/figs-metaphor" -> "translate/figs-metaphor"
+                repo_path = repo_path_text[0]["plain_text"]
+                if not repo_path.startswith("en_ta/"):
+                    continue
+                article_key = repo_path[6:]  # Remove "en_ta/" prefix
                 
                 # Get title for logging
-                if "Title" in page["properties"]:
-                    title_prop = page["properties"]["Title"]
-                    if title_prop.get("title"):
-                        title = title_prop["title"][0]["plain_text"]
+                title_text = properties.get("Title", {}).get("title")
+                title = title_text[0]["plain_text"] if title_text else ""
                 
-                if repo_path:
-                    # Convert repo path to article key format
-                    # e.g., "en_ta/translate/figs-metaphor" -> "translate/figs-metaphor"
-                    if repo_path.startswith("en_ta/"):
-                        article_key = repo_path[6:]  # Remove "en_ta/" prefix
-                        self.page_map[article_key] = {
-                            "page_id": page["id"],
-                            "title": title
-                        }
-                        logger.debug(f"Mapped {article_key} -> {title}")
+                self.page_map[article_key] = {
+                    "page_id": page["id"],
+                    "title": title,
+                    "notion_url": f"https://www.notion.so/{page['id'].replace('-', '')}",
+                    "last_edited_time": page.get("last_edited_time")
+                }
+                logger.debug("Mapped %s -> %s", article_key, title)
             
-            logger.info(f"Created mapping for {len(self.page_map)} articles")
+            logger.info("Found %d pages in database", page_count)
+            logger.info("Created mapping for %d articles", len(self.page_map))
             return True
             
         except Exception as e:
-            logger.error(f"Error loading page mapping: {e}")
+            logger.error("Error loading page mapping: %s", e)
             return False
     
-    def resolve_relative_path(self, current_path: str, relative_path: str) -> Optional[str]:
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def resolve_relative_path(current_path: str, relative_path: str) -> Optional[str]:
         """Resolve a relative path to an absolute article path."""
+        # Cached: pages link the same articles repeatedly and the result only depends on the arguments
         try:
-            # Remove /01.md suffix if present
+            # Remove /01.md suffix if present (endswith + slice rather than str.removesuffix,
+            # which needs Python 3.9; the README supports 3.7+)
             if relative_path.endswith("/01.md"):
                 relative_path = relative_path[:-6]
             
@@ -114,16 +162,16 @@ class LinkReplacer:
             current_parts = current_path.split("/")
             current_section = current_parts[0] if current_parts else ""
             
-            # Resolve relative path
-            if relative_path.startswith("../"):
+            # Resolve relative path (the longer "../../" prefix must be checked first)
+            if relative_path.startswith("../../"):
+                # Cross-section link - remove "../../" and use as-is
+                resolved_path = relative_path[6:]  # Remove "../../"
+                
+            elif relative_path.startswith("../"):
                 # Same section link - just replace with section/article
                 article_name = relative_path[3:]  # Remove "../"
                 resolved_path = f"{current_section}/{article_name}"
                 
-            elif relative_path.startswith("../../"):
-                # Cross-section link - remove "../../" and use as-is
-                resolved_path = relative_path[6:]  # Remove "../../"
-                
             else:
                 # Relative to current directory
                 if current_parts:
@@ -131,9 +179,12 @@ class LinkReplacer:
                 else:
                     resolved_path = relative_path
             
-            # Clean up any double slashes and fix "../" patterns
-            resolved_path = re.sub(r'/+', '/', resolved_path)
-            resolved_path = re.sub(r'[^/]+/\.\./+', '', resolved_path)  # Remove "section/../" patterns
+            # Clean up any double slashes and fix "../" patterns; most paths are
+            # already clean, so only run the regexes when they can match
+            if '//' in resolved_path:
+                resolved_path = MULTI_SLASH_PATTERN.sub('/', resolved_path)
+            if '/../' in resolved_path:
+                resolved_path = PARENT_DIR_PATTERN.sub('', resolved_path)  # Remove "section/../" patterns
             
             # Remove leading slash if present
             if resolved_path.startswith("/"):
@@ -142,16 +193,14 @@ class LinkReplacer:
             return resolved_path
             
         except Exception as e:
-            logger.error(f"Error resolving path {relative_path} from {current_path}: {e}")
+            logger.error("Error resolving path %s from %s: %s", relative_path, current_path, e)
             return None
     
-    def is_internal_link(self, url: str) -> bool:
+    @staticmethod
+    def is_internal_link(url: str) -> bool:
         """Check if a URL is an internal link that should be replaced."""
-        return (
-            url.endswith("/01.md") or 
-            (url.startswith("../") and "/01.md" not in url) or
-            (url.startswith("../../") and "/01.md" not in url)
-        )
+        # Article links end in /01.md; any other relative link ("../x", "../../s/x") counts too
+        return url.endswith("/01.md") or url.startswith("../")
     
     def get_page_content(self, page_id: str) -> List[Dict]:
         """Get all content blocks from a page."""
@@ -178,11 +227,15 @@ class LinkReplacer:
             return blocks
             
         except Exception as e:
-            logger.error(f"Error getting page content for {page_id}: {e}")
+            logger.error("Error getting page content for %s: %s", page_id, e)
             return []
     
     def update_rich_text_links(self, rich_text: List[Dict], current_path: str) -> Tuple[List[Dict], int]:
         """Update links in rich text array."""
+        # Most rich text has no links at all; hand back the same list untouched
+        if not any(item.get("type") == "text" and item.get("text", {}).get("link") for item in rich_text):
+            return rich_text, 0
+        
         updated_rich_text = []
         links_replaced = 0
         
@@ -192,26 +245,25 @@ class LinkReplacer:
                 link_obj = text_obj.get("link")
                 
                 if link_obj and self.is_internal_link(link_obj["url"]):
+                    original_url = link_obj["url"]
+                    
                     # Resolve the relative path
-                    resolved_path = self.resolve_relative_path(current_path, link_obj["url"])
+                    resolved_path = self.resolve_relative_path(current_path, original_url)
                     
                     if resolved_path and resolved_path in self.page_map:
-                        # Replace with Notion page link
-                        target_page_id = self.page_map[resolved_path]["page_id"]
-                        new_url = f"https://www.notion.so/{target_page_id.replace('-', '')}"
-                        
-                        # Update the link
-                        updated_item = item.copy()
-                        updated_item["text"]["link"]["url"] = new_url
-                        updated_rich_text.append(updated_item)
+                        # Replace with the Notion page link formatted at load time. A shallow
+                        # copy would still share the link dict, so update the item in place.
+                        link_obj["url"] = self.page_map[resolved_path]["notion_url"]
+                        updated_rich_text.append(item)
                         
                         links_replaced += 1
-                        logger.info(f"  Replaced: {link_obj['url']} -> {self.page_map[resolved_path]['title']}")
+                        # Per-link detail is debug only; update_page_links logs one summary per page
+                        logger.debug("  Replaced: %s -> %s", original_url, self.page_map[resolved_path]["title"])
                     else:
                         # Keep original link if we can't resolve it
                         updated_rich_text.append(item)
                         if resolved_path:
-                            logger.warning(f"  Could not find page for: {resolved_path}")
+                            logger.warning("  Could not find page for: %s (linked from %s)", resolved_path, current_path)
                 else:
                     updated_rich_text.append(item)
             else:
@@ -219,95 +271,107 @@ class LinkReplacer:
         
         return updated_rich_text, links_replaced
     
-    def update_block_links(self, block: Dict, current_path: str) -> Tuple[Dict, int]:
-        """Update links in a single block."""
-        updated_block = block.copy()
-        links_replaced = 0
-        
+    def update_block_links(self, block: Dict, current_path: str) -> Tuple[Optional[Dict], int]:
+        """Return the blocks.update payload for a block (None if unchanged) and the links replaced."""
         block_type = block.get("type")
         
-        # Handle different block types with rich text
-        if block_type in ["paragraph", "heading_1", "heading_2", "heading_3", "bulleted_list_item", "numbered_list_item"]:
-            rich_text = block.get(block_type, {}).get("rich_text", [])
-            if rich_text:
-                updated_rich_text, replaced = self.update_rich_text_links(rich_text, current_path)
-                updated_block[block_type]["rich_text"] = updated_rich_text
-                links_replaced += replaced
+        if block_type not in RICH_TEXT_BLOCK_TYPES:
+            return None, 0
         
-        elif block_type == "quote":
-            rich_text = block.get("quote", {}).get("rich_text", [])
-            if rich_text:
-                updated_rich_text, replaced = self.update_rich_text_links(rich_text, current_path)
-                updated_block["quote"]["rich_text"] = updated_rich_text
-                links_replaced += replaced
+        rich_text = block.get(block_type, {}).get("rich_text", [])
+        if not rich_text:
+            return None, 0
         
-        elif block_type == "callout":
-            rich_text = block.get("callout", {}).get("rich_text", [])
-            if rich_text:
-                updated_rich_text, replaced = self.update_rich_text_links(rich_text, current_path)
-                updated_block["callout"]["rich_text"] = updated_rich_text
-                links_replaced += replaced
+        updated_rich_text, links_replaced = self.update_rich_text_links(rich_text, current_path)
+        if not links_replaced:
+            return None, 0
         
-        return updated_block, links_replaced
+        return {block_type: {"rich_text": updated_rich_text}}, links_replaced
+    
+    def has_internal_link(self, block: Dict) -> bool:
+        """Check if a block's rich text contains any internal link, resolvable or not."""
+        block_type = block.get("type")
+        if block_type not in RICH_TEXT_BLOCK_TYPES:
+            return False
+        
+        for item in block[block_type].get("rich_text", []):
+            link_obj = item.get("text", {}).get("link") if item.get("type") == "text" else None
+            if link_obj and self.is_internal_link(link_obj["url"]):
+                return True
+        return False
     
     def update_page_links(self, page_id: str, current_path: str, title: str) -> bool:
         """Update all links in a page."""
-        logger.info(f"Updating links in: {title}")
+        logger.debug("Updating links in: %s", title)
         
         try:
             # Get all blocks from the page
             blocks = self.get_page_content(page_id)
             
             if not blocks:
-                logger.info(f"  No blocks found in page")
+                logger.debug("%s: no blocks found in page", title)
+                with self.stats_lock:
+                    self.clean_page_ids.add(page_id)
+                return True
+            
+            # Every internal link starts with "../" or ends with "/01.md"; if neither appears
+            # anywhere in the page, skip the per-block scan entirely
+            serialized_blocks = json.dumps(blocks)
+            if "../" not in serialized_blocks and "/01.md" not in serialized_blocks:
+                logger.debug("%s: no internal links in page", title)
+                with self.stats_lock:
+                    self.clean_page_ids.add(page_id)
                 return True
             
-            # Update links in each block
-            updated_blocks = []
             page_links_replaced = 0
             
+            # Patch only the blocks whose links changed; everything else is left untouched
             for block in blocks:
-                updated_block, links_replaced = self.update_block_links(block, current_path)
-                updated_blocks.append(updated_block)
-                page_links_replaced += links_replaced
+                update_data, links_replaced = self.update_block_links(block, current_path)
+                
+                if update_data:
+                    notion.blocks.update(block_id=block["id"], **update_data)
+                    page_links_replaced += links_replaced
             
-            # Update blocks if any links were replaced
             if page_links_replaced > 0:
-                # Delete existing blocks
-                for block in blocks:
-                    try:
-                        notion.blocks.delete(block_id=block["id"])
-                    except Exception as e:
-                        logger.warning(f"  Could not delete block {block['id']}: {e}")
-                
-                # Add updated blocks
-                # Process in batches to avoid API limits
-                batch_size = 100
-                for i in range(0, len(updated_blocks), batch_size):
-                    batch = updated_blocks[i:i + batch_size]
-                    
-                    # Remove IDs from blocks before adding
-                    clean_batch = []
-                    for block in batch:
-                        clean_block = {k: v for k, v in block.items() if k not in ["id", "created_time", "last_edited_time", "created_by", "last_edited_by", "archived", "has_children"]}
-                        clean_batch.append(clean_block)
-                    
-                    notion.blocks.children.append(
-                        block_id=page_id,
-                        children=clean_batch
-                    )
-                
-                logger.info(f"  Replaced {page_links_replaced} links")
-                self.total_links_replaced += page_links_replaced
-                return True
+                logger.info("%s: replaced %d links", title, page_links_replaced)
+                with self.stats_lock:
+                    self.total_links_replaced += page_links_replaced
             else:
-                logger.info(f"  No links to replace")
-                return True
+                logger.debug("%s: no links to replace", title)
+                
+                # Only remember pages with no internal links at all; unresolved ones may
+                # resolve once their target page exists
+                if not any(self.has_internal_link(block) for block in blocks):
+                    with self.stats_lock:
+                        self.clean_page_ids.add(page_id)
+            
+            return True
                 
         except Exception as e:
-            logger.error(f"Error updating links in page {page_id}: {e}")
+            logger.error("Error updating links in page %s: %s", page_id, e)
             return False
     
+    def load_link_scan_cache(self):
+        """Load the pages a previous run found to have no internal links."""
+        if not LINK_SCAN_CACHE_FILE.exists():
+            return
+        
+        try:
+            with open(LINK_SCAN_CACHE_FILE, 'r', encoding='utf-8') as f:
+                self.link_scan_cache = json.load(f)
+            logger.info("Loaded %d clean pages from %s", len(self.link_scan_cache), LINK_SCAN_CACHE_FILE)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Could not read link scan cache %s: %s", LINK_SCAN_CACHE_FILE, e)
+    
+    def save_link_scan_cache(self):
+        """Save the clean pages so the next run can skip fetching their content."""
+        try:
+            with open(LINK_SCAN_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(self.link_scan_cache, f)
+        except OSError as e:
+            logger.warning("Could not write link scan cache %s: %s", LINK_SCAN_CACHE_FILE, e)
+    
     def process_all_pages(self):
         """Process all pages in the database."""
         logger.info("Starting link replacement process...")
@@ -316,27 +380,48 @@ class LinkReplacer:
             logger.error("Failed to load page mapping")
             return
         
-        success_count = 0
+        # Link updates start only after the whole mapping is loaded: any page may link to
+        # one that appears in a later query batch. The mapping costs ~1 query per 100
+        # pages, so overlapping it with block fetches would gain little under the
+        # shared rate limit.
+        self.load_link_scan_cache()
         total_pages = len(self.page_map)
         
-        for i, (article_path, page_info) in enumerate(self.page_map.items(), 1):
-            logger.info(f"Processing ({i}/{total_pages}): {article_path}")
+        def process_page(item) -> bool:
+            i, (article_path, page_info) = item
+            page_id = page_info["page_id"]
+            last_edited_time = page_info.get("last_edited_time")
+            
+            # Unchanged since a scan that found no internal links, so skip fetching its blocks
+            if last_edited_time and self.link_scan_cache.get(page_id) == last_edited_time:
+                logger.debug("Skipping (%d/%d): %s (unchanged, no links)", i, total_pages, article_path)
+                return True
+            
+            logger.debug("Processing (%d/%d): %s", i, total_pages, article_path)
             
             try:
-                if self.update_page_links(page_info["page_id"], article_path, page_info["title"]):
-                    success_count += 1
-                    self.updated_pages += 1
-                
-                # Rate limiting
-                time.sleep(0.2)
+                if self.update_page_links(page_id, article_path, page_info["title"]):
+                    with self.stats_lock:
+                        self.updated_pages += 1
+                        if page_id in self.clean_page_ids and last_edited_time:
+                            self.link_scan_cache[page_id] = last_edited_time
+                    return True
                 
             except Exception as e:
-                logger.error(f"Error processing {article_path}: {e}")
-                continue
+                logger.error("Error processing %s: %s", article_path, e)
+            
+            return False
+        
+        # Pages are independent and HTTP-bound, so process them concurrently;
+        # the shared limiter replaces the fixed sleep between pages
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            success_count = sum(executor.map(process_page, enumerate(self.page_map.items(), 1)))
+        
+        self.save_link_scan_cache()
         
-        logger.info(f"Link replacement complete:")
-        logger.info(f"  Pages processed: {success_count}/{total_pages}")
-        logger.info(f"  Total links replaced: {self.total_links_replaced}")
+        logger.info("Link replacement complete:")
+        logger.info("  Pages processed: %d/%d", success_count, total_pages)
+        logger.info("  Total links replaced: %d", self.total_links_replaced)
 
 def main():
     """Main function."""
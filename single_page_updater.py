@@ -7,10 +7,13 @@ Based on migration_v8.py but focused on updating a single page
 import os
 import re
 import logging
-import time
-from typing import Dict, List, Optional
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
 from notion_client import Client
+from notion_rate_limit import rate_limit_endpoints
 
 # Set up logging
 logging.basicConfig(
@@ -30,156 +33,167 @@ load_dotenv()
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 DATABASE_ID = "340b5f5c4f574a6abd215e5b30aac26c"
 
-# Initialize Notion client
-notion = Client(auth=NOTION_API_KEY)
+# Maximum number of child blocks Notion accepts in a single append request
+MAX_CHILDREN_PER_REQUEST = 100
+# Table paragraphs replaced, and old blocks deleted, concurrently
+MAX_WORKERS = 8
 
-class SinglePageUpdater:
-    def __init__(self):
-        pass
+# Initialize Notion client on a shared connection pool sized for the worker threads,
+# so every worker keeps its connection alive between requests
+notion = Client(
+    auth=NOTION_API_KEY,
+    client=httpx.Client(limits=httpx.Limits(
+        max_connections=MAX_WORKERS,
+        max_keepalive_connections=MAX_WORKERS
+    ))
+)
+
+def chunk_array(items: List, size: int = MAX_CHILDREN_PER_REQUEST) -> List[List]:
+    """Split a list into consecutive chunks of at most size items."""
+    return [items[i:i+size] for i in range(0, len(items), size)]
+
+# Route the Notion endpoints that are called in bulk through the shared limiter
+rate_limit_endpoints([
+    (notion.blocks, "delete"),
+    (notion.blocks.children, "append"),
+    (notion.blocks.children, "list"),
+])
+
+# Inline markdown runs: **bold**, *italic* and [link text](url), tried in that order
+EMPHASIS_RUNS = r'\*\*(?P<bold>.*?)\*\*|\*(?P<italic>[^*]+)\*'
+LINK_RUN = r'\[(?P<link_text>[^\]]*)\]\((?P<link_url>[^)]*)\)'
+RICH_TEXT_PATTERN = re.compile(EMPHASIS_RUNS + '|' + LINK_RUN, re.DOTALL)
+# Text without "](" cannot hold a link, so stray "[" need not be scanned for one
+EMPHASIS_PATTERN = re.compile(EMPHASIS_RUNS, re.DOTALL)
+
+# A line that, once stripped, starts and ends with a pipe and holds at least three of them
+TABLE_LINE_PATTERN = re.compile(r'^[^\S\n]*\|[^\n]*\|[^\n]*\|[^\S\n]*$', re.MULTILINE)
+
+def tokenize_rich_text(text: str) -> List[Dict]:
+    """Parse text for bold, italic, and links in a single pass over the text."""
+    if not text:
+        return [{"type": "text", "text": {"content": ""}}]
     
-    def parse_rich_text(self, text: str) -> List[Dict]:
-        """Parse text for bold, italic, and links - simple and reliable approach."""
-        if not text:
-            return [{"type": "text", "text": {"content": ""}}]
-        
-        # Clean up any weird whitespace
-        text = text.strip()
-        if not text:
-            return [{"type": "text", "text": {"content": ""}}]
-        
-        result = []
-        i = 0
-        
-        while i < len(text):
-            # Look for **bold** text
-            if text[i:i+2] == '**':
-                # Find the closing **
-                end = text.find('**', i + 2)
-                if end != -1:
-                    if i > 0:
-                        # Add text before bold
-                        result.append({
-                            "type": "text",
-                            "text": {"content": text[:i]}
-                        })
-                        text = text[i:]
-                        end = end - i
-                        i = 0
-                    
-                    bold_text = text[2:end]
-                    result.append({
-                        "type": "text",
-                        "text": {"content": bold_text},
-                        "annotations": {"bold": True}
-                    })
-                    text = text[end+2:]
-                    i = 0
-                    continue
-            
-            # Look for *italic* text
-            elif text[i] == '*' and i + 1 < len(text) and text[i+1] != '*':
-                # Find the closing *
-                end = text.find('*', i + 1)
-                if end != -1:
-                    if i > 0:
-                        # Add text before italic
-                        result.append({
-                            "type": "text",
-                            "text": {"content": text[:i]}
-                        })
-                        text = text[i:]
-                        end = end - i
-                        i = 0
-                    
-                    italic_text = text[1:end]
-                    result.append({
-                        "type": "text",
-                        "text": {"content": italic_text},
-                        "annotations": {"italic": True}
-                    })
-                    text = text[end+1:]
-                    i = 0
-                    continue
-            
-            # Look for [link text](url) patterns
-            elif text[i] == '[':
-                # Find the closing ]
-                close_bracket = text.find(']', i + 1)
-                if close_bracket != -1 and close_bracket + 1 < len(text) and text[close_bracket + 1] == '(':
-                    # Find the closing )
-                    close_paren = text.find(')', close_bracket + 2)
-                    if close_paren != -1:
-                        if i > 0:
-                            # Add text before link
-                            result.append({
-                                "type": "text",
-                                "text": {"content": text[:i]}
-                            })
-                            text = text[i:]
-                            close_bracket = close_bracket - i
-                            close_paren = close_paren - i
-                            i = 0
-                        
-                        link_text = text[1:close_bracket]
-                        link_url = text[close_bracket + 2:close_paren]
-                        result.append({
-                            "type": "text",
-                            "text": {"content": link_text, "link": {"url": link_url}}
-                        })
-                        text = text[close_paren + 1:]
-                        i = 0
-                        continue
-            
-            i += 1
+    # Clean up any weird whitespace
+    text = text.strip()
+    if not text:
+        return [{"type": "text", "text": {"content": ""}}]
+    
+    result = []
+    pos = 0
+    
+    pattern = RICH_TEXT_PATTERN if '](' in text else EMPHASIS_PATTERN
+    
+    for match in pattern.finditer(text):
+        # Add plain text before the formatted run
+        if match.start() > pos:
+            result.append({
+                "type": "text",
+                "text": {"content": text[pos:match.start()]}
+            })
         
-        # Add any remaining text
-        if text:
+        if match.group("bold") is not None:
             result.append({
                 "type": "text",
-                "text": {"content": text}
+                "text": {"content": match.group("bold")},
+                "annotations": {"bold": True}
+            })
+        elif match.group("italic") is not None:
+            result.append({
+                "type": "text",
+                "text": {"content": match.group("italic")},
+                "annotations": {"italic": True}
+            })
+        else:
+            result.append({
+                "type": "text",
+                "text": {"content": match.group("link_text"), "link": {"url": match.group("link_url")}}
             })
         
-        return result if result else [{"type": "text", "text": {"content": ""}}]
+        pos = match.end()
+    
+    # Add any remaining text
+    if pos < len(text):
+        result.append({
+            "type": "text",
+            "text": {"content": text[pos:]}
+        })
     
-    def process_table(self, lines: List[str], start_i: int) -> tuple:
-        """Process markdown table and convert to Notion table block."""
+    return result if result else [{"type": "text", "text": {"content": ""}}]
+
+# Rich text for an empty table cell, shared by every such cell and never mutated
+EMPTY_RICH_TEXT = [{"type": "text", "text": {"content": ""}}]
+
+# Longer text is unlikely to repeat, so it is parsed without filling the cache
+MAX_CACHED_RICH_TEXT_LENGTH = 512
+
+@functools.lru_cache(maxsize=4096)
+def cached_rich_text(text: str) -> Tuple[Dict, ...]:
+    """Memoized tokenize_rich_text for repeated table cells and headers."""
+    # The run dicts are shared between callers and must not be mutated
+    return tuple(tokenize_rich_text(text))
+
+class SinglePageUpdater:
+    def __init__(self):
+        pass
+    
+    def parse_rich_text(self, text: str) -> List[Dict]:
+        """Parse text for bold, italic, and links, reusing earlier results for short text."""
+        if len(text) > MAX_CACHED_RICH_TEXT_LENGTH:
+            return tokenize_rich_text(text)
+        
+        # Copy the cached tuple so callers get a list they can extend
+        return list(cached_rich_text(text))
+    
+    def make_table_row(self, cells: List[str]) -> Dict:
+        """Build a Notion table_row block from a list of cell strings."""
+        return {
+            "object": "block",
+            "type": "table_row",
+            "table_row": {
+                "cells": [self.parse_rich_text(cell) if cell else EMPTY_RICH_TEXT for cell in cells]
+            }
+        }
+    
+    def process_table(self, lines: List[str], start_i: int) -> Tuple[Optional[Dict], int]:
+        """Process markdown table (already stripped lines) and return the Notion table block (or None) and the next line index."""
         try:
-            table_lines = []
+            headers = None
+            table_rows = []
+            data_lines = 0
             i = start_i
             
-            # Collect all table lines (starting with |)
-            while i < len(lines) and lines[i].strip().startswith('|'):
-                line = lines[i].strip()
-                if line.endswith('|'):
-                    table_lines.append(line)
+            # Parse table lines (starting with |) as they are read, in a single pass
+            while i < len(lines):
+                line = lines[i]
+                if not line.startswith('|'):
+                    break
                 i += 1
-            
-            if len(table_lines) < 2:
-                # Not a valid table, return None
-                return None, start_i + 1
-            
-            # Parse table structure
-            header_line = table_lines[0]
-            headers = [cell.strip() for cell in header_line.split('|')[1:-1]]  # Remove empty first/last
-            
-            # Skip separator line if it exists (like |----|----|)
-            data_start = 1
-            if len(table_lines) > 1 and all(c in '-|: ' for c in table_lines[1]):
-                data_start = 2
-            
-            # Parse data rows
-            rows = []
-            for line in table_lines[data_start:]:
+                
+                if not line.endswith('|'):
+                    continue
+                
                 cells = [cell.strip() for cell in line.split('|')[1:-1]]  # Remove empty first/last
+                
+                if headers is None:
+                    headers = cells
+                    table_rows.append(self.make_table_row(headers))
+                    continue
+                
+                # Skip separator line if it exists (like |----|----|)
+                data_lines += 1
+                if data_lines == 1 and all(c in '-|: ' for c in line):
+                    continue
+                
                 if len(cells) >= len(headers):
-                    rows.append(cells[:len(headers)])  # Truncate to header count
+                    table_rows.append(self.make_table_row(cells[:len(headers)]))  # Truncate to header count
                 elif len(cells) > 0:
                     # Pad short rows with empty cells
-                    while len(cells) < len(headers):
-                        cells.append('')
-                    rows.append(cells)
+                    cells.extend([''] * (len(headers) - len(cells)))
+                    table_rows.append(self.make_table_row(cells))
             
-            if not rows:
+            # Not a valid table without at least one data row
+            if len(table_rows) < 2:
                 return None, start_i + 1
             
             # Create Notion table block
@@ -190,43 +204,10 @@ class SinglePageUpdater:
                     "table_width": len(headers),
                     "has_column_header": True,
                     "has_row_header": False,
-                    "children": []
-                }
-            }
-            
-            # Add header row
-            header_row = {
-                "object": "block",
-                "type": "table_row",
-                "table_row": {
-                    "cells": []
+                    "children": table_rows
                 }
             }
             
-            for header in headers:
-                header_row["table_row"]["cells"].append(
-                    self.parse_rich_text(header) if header else [{"type": "text", "text": {"content": ""}}]
-                )
-            
-            table_block["table"]["children"].append(header_row)
-            
-            # Add data rows
-            for row in rows:
-                row_block = {
-                    "object": "block",
-                    "type": "table_row",
-                    "table_row": {
-                        "cells": []
-                    }
-                }
-                
-                for cell in row:
-                    row_block["table_row"]["cells"].append(
-                        self.parse_rich_text(cell) if cell else [{"type": "text", "text": {"content": ""}}]
-                    )
-                
-                table_block["table"]["children"].append(row_block)
-            
             return table_block, i
             
         except Exception as e:
@@ -235,25 +216,24 @@ class SinglePageUpdater:
     
     def detect_table_in_text(self, text: str) -> bool:
         """Check if text contains a markdown table."""
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('|') and line.endswith('|') and line.count('|') >= 3:
-                return True
-        return False
+        # A table row needs at least three pipes, so most paragraphs are ruled out without a scan
+        if text.count('|') < 3:
+            return False
+        return TABLE_LINE_PATTERN.search(text) is not None
     
     def convert_table_text_to_blocks(self, text: str) -> List[Dict]:
         """Convert text containing markdown table to Notion blocks."""
         lines = text.split('\n')
+        # Strip and classify every line once; only lines opening and closing with "|" can be table rows
+        stripped_lines = [line.strip() for line in lines]
+        row_like = [line[:1] == '|' and line[-1:] == '|' for line in stripped_lines]
         blocks = []
         i = 0
         
         while i < len(lines):
-            line = lines[i].strip()
-            
             # Check for table
-            if line.startswith('|') and line.endswith('|') and line.count('|') >= 3:
-                table_block, new_i = self.process_table(lines, i)
+            if row_like[i] and stripped_lines[i].count('|') >= 3:
+                table_block, new_i = self.process_table(stripped_lines, i)
                 if table_block:
                     blocks.append(table_block)
                     i = new_i
@@ -261,8 +241,14 @@ class SinglePageUpdater:
             
             # Regular text - collect non-table lines
             text_lines = []
-            while i < len(lines) and not (lines[i].strip().startswith('|') and lines[i].strip().endswith('|')):
-                if lines[i].strip():  # Skip empty lines
+            
+            # A row-like line that did not form a table is kept as text, so the scan always moves on
+            if row_like[i]:
+                text_lines.append(lines[i])
+                i += 1
+            
+            while i < len(lines) and not row_like[i]:
+                if stripped_lines[i]:  # Skip empty lines
                     text_lines.append(lines[i])
                 i += 1
             
@@ -290,10 +276,11 @@ class SinglePageUpdater:
                 if start_cursor:
                     response = notion.blocks.children.list(
                         block_id=page_id,
-                        start_cursor=start_cursor
+                        start_cursor=start_cursor,
+                        page_size=100
                     )
                 else:
-                    response = notion.blocks.children.list(block_id=page_id)
+                    response = notion.blocks.children.list(block_id=page_id, page_size=100)
                 
                 blocks.extend(response["results"])
                 
@@ -308,35 +295,38 @@ class SinglePageUpdater:
             logger.error(f"Error getting page content for {page_id}: {e}")
             return []
     
-    def update_page_content(self, page_id: str, new_blocks: List[Dict]) -> bool:
-        """Replace all content in a page with new blocks."""
+    def insert_after_block(self, page_id: str, block_id: str, new_blocks: List[Dict]) -> bool:
+        """Insert new blocks right after an existing block, keeping their order."""
         try:
-            # Get existing blocks
-            existing_blocks = self.get_page_content(page_id)
-            
-            # Delete existing blocks
-            for block in existing_blocks:
-                try:
-                    notion.blocks.delete(block_id=block["id"])
-                    time.sleep(0.1)  # Rate limiting
-                except Exception as e:
-                    logger.warning(f"Could not delete block {block['id']}: {e}")
-            
-            # Add new blocks
-            for block in new_blocks:
-                try:
-                    notion.blocks.children.append(block_id=page_id, children=[block])
-                    time.sleep(0.1)  # Rate limiting
-                except Exception as e:
-                    logger.error(f"Error adding block: {e}")
-                    return False
-            
+            # Every chunk is placed right after the old block, so append the last chunk first
+            for chunk in reversed(chunk_array(new_blocks)):
+                notion.blocks.children.append(block_id=page_id, children=chunk, after=block_id)
             return True
             
         except Exception as e:
-            logger.error(f"Error updating page content: {e}")
+            logger.error(f"Error inserting blocks after {block_id}: {e}")
             return False
     
+    def delete_blocks(self, block_ids: List[str]) -> List[str]:
+        """Delete blocks concurrently and return the IDs of any that could not be deleted."""
+        def delete_block(block_id):
+            """Delete one block, returning its ID if the delete failed."""
+            try:
+                notion.blocks.delete(block_id=block_id)
+                return None
+            except Exception as e:
+                logger.debug("Could not delete block %s: %s", block_id, e)
+                return block_id
+        
+        # The shared limiter keeps the pool under Notion's rate limit
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            failed_deletes = [block_id for block_id in executor.map(delete_block, block_ids) if block_id]
+        
+        if failed_deletes:
+            logger.warning(f"Could not delete {len(failed_deletes)} block(s): {', '.join(failed_deletes)}")
+        
+        return failed_deletes
+    
     def process_page_for_tables(self, page_id: str, title: str) -> bool:
         """Process a single page to find and convert table text to proper tables."""
         logger.info(f"Processing page: {title}")
@@ -351,50 +341,51 @@ class SinglePageUpdater:
             
             logger.info(f"Found {len(blocks)} blocks")
             
-            # Look for blocks that contain table markdown
-            new_blocks = []
-            tables_found = 0
+            # Look for paragraphs that contain table markdown; every other block is left untouched
+            replacements = []
+            table_positions = []
             
             for i, block in enumerate(blocks):
-                block_type = block.get("type")
+                if block.get("type") != "paragraph":
+                    continue
                 
-                if block_type == "paragraph":
-                    rich_text = block.get("paragraph", {}).get("rich_text", [])
-                    if rich_text:
-                        # Reconstruct text from rich_text
-                        text_content = ""
-                        for item in rich_text:
-                            if item.get("type") == "text":
-                                text_content += item.get("text", {}).get("content", "")
-                        
-                        # Check if this text contains a table
-                        if self.detect_table_in_text(text_content):
-                            logger.info(f"Found table in block {i+1}")
-                            tables_found += 1
-                            
-                            # Convert table text to proper blocks
-                            table_blocks = self.convert_table_text_to_blocks(text_content)
-                            new_blocks.extend(table_blocks)
-                        else:
-                            # Keep original block
-                            new_blocks.append(block)
-                    else:
-                        # Keep original block
-                        new_blocks.append(block)
-                else:
-                    # Keep original block
-                    new_blocks.append(block)
+                rich_text = block.get("paragraph", {}).get("rich_text", [])
+                if not rich_text:
+                    continue
+                
+                # Reconstruct text from rich_text
+                text_content = "".join(
+                    item.get("text", {}).get("content", "") for item in rich_text if item.get("type") == "text"
+                )
+                
+                # Check if this text contains a table
+                if self.detect_table_in_text(text_content):
+                    table_positions.append(i + 1)
+                    
+                    # Convert table text to proper blocks
+                    replacements.append((block["id"], self.convert_table_text_to_blocks(text_content)))
             
-            if tables_found > 0:
-                logger.info(f"Converting {tables_found} table(s) to proper Notion tables")
+            if replacements:
+                logger.info(f"Converting {len(replacements)} table(s) to proper Notion tables (blocks {table_positions})")
                 
-                # Update page content
-                if self.update_page_content(page_id, new_blocks):
-                    logger.info("Page updated successfully!")
-                    return True
-                else:
-                    logger.error("Failed to update page")
+                # Swap only the table paragraphs in place instead of rewriting the whole page.
+                # Each insert is anchored on its own block, so they can run concurrently
+                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                    inserted = list(executor.map(
+                        lambda replacement: self.insert_after_block(page_id, *replacement), replacements
+                    ))
+                
+                # Remove the old paragraphs only where their replacement is in place
+                failed_deletes = self.delete_blocks([
+                    block_id for (block_id, _), ok in zip(replacements, inserted) if ok
+                ])
+                
+                if not all(inserted) or failed_deletes:
+                    logger.error(f"Failed to update page ({inserted.count(False)} table(s) not converted, {len(failed_deletes)} old paragraph(s) left)")
                     return False
+                
+                logger.info("Page updated successfully!")
+                return True
             else:
                 logger.info("No tables found in this page")
                 return True
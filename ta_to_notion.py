@@ -1,12 +1,19 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import hashlib
 import re
 import logging
 import argparse
+import threading
+import httpx
 from dotenv import load_dotenv
 from notion_client import Client
-import time
+from notion_rate_limit import rate_limit_endpoints
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
 # Set up logging
 logging.basicConfig(
@@ -40,6 +47,27 @@ GITEA_REPO_OWNER = "unfoldingWord"
 GITEA_REPO_NAME = "en_ta"
 GITEA_BRANCH = "master"
 
+# Shared Gitea session so connections are kept alive between requests
+gitea_session = requests.Session()
+gitea_session.headers.update({"Authorization": f"token {GITEA_API_KEY}"})
+
+# Files each article fetches from Gitea at once (title, sub-title and body)
+FILES_PER_ARTICLE = 3
+
+def mount_gitea_adapter(workers):
+    """Size the Gitea connection pool so every concurrent file fetch keeps its own connection."""
+    gitea_session.mount("https://", HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=workers * FILES_PER_ARTICLE,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    ))
+
+# Downloaded Gitea files, revalidated with ETags so unchanged files are not downloaded again
+GITEA_CACHE_DIR = Path(os.getenv("TA_CACHE_DIR", "~/.cache/ta_to_notion")).expanduser()
+
+# Commit at the tip of GITEA_BRANCH for this run, looked up once in main()
+branch_sha = None
+
 # Notion parent page ID - Format properly for API
 def format_notion_id(id_str):
     """Format a Notion ID to the correct UUID format."""
@@ -62,14 +90,38 @@ RAW_NOTION_ID = "1c372d5af2de80e08b11cd7748a1467d"
 NOTION_PARENT_PAGE_ID = format_notion_id(RAW_NOTION_ID)
 logger.info(f"Using Notion page ID: {NOTION_PARENT_PAGE_ID}")
 
-# Initialize Notion client
-notion = Client(auth=NOTION_API_KEY)
+# Maximum number of child blocks Notion accepts in a single request
+MAX_CHILDREN_PER_REQUEST = 100
+# Articles imported concurrently; the shared limiter caps the overall request rate
+MAX_WORKERS = 8
+
+# Pool sized for the default worker count; main() resizes it for --workers
+mount_gitea_adapter(MAX_WORKERS)
+
+# Initialize Notion client on a shared connection pool sized for the worker threads,
+# so every worker keeps its connection alive between requests
+notion = Client(
+    auth=NOTION_API_KEY,
+    client=httpx.Client(limits=httpx.Limits(
+        max_connections=MAX_WORKERS,
+        max_keepalive_connections=MAX_WORKERS
+    ))
+)
+
+# Route every Notion endpoint used by this script through the limiter
+rate_limit_endpoints([
+    (notion, "search"),
+    (notion.pages, "create"),
+    (notion.blocks.children, "list"),
+    (notion.blocks.children, "append"),
+])
 
 def read_article_list(file_path):
     """Read the list of articles to import from a file."""
     try:
-        with open(file_path, 'r') as f:
-            articles = [line.strip() for line in f.readlines() if line.strip()]
+        with open(file_path, 'r', encoding='utf-8') as f:
+            # Iterate the file lazily and strip each line only once
+            articles = [line for line in (raw_line.strip() for raw_line in f) if line]
         return articles
     except FileNotFoundError:
         logger.error(f"Article list file not found: {file_path}")
@@ -78,25 +130,114 @@ def read_article_list(file_path):
         logger.error(f"Error reading article list: {str(e)}")
         return []
 
+def fetch_branch_sha():
+    """Look up the current commit SHA of the Gitea branch, or None if it cannot be read."""
+    url = f"{GITEA_BASE_URL}/repos/{GITEA_REPO_OWNER}/{GITEA_REPO_NAME}/branches/{GITEA_BRANCH}"
+    
+    try:
+        response = gitea_session.get(url, timeout=(5, 30))
+        response.raise_for_status()
+        return response.json()["commit"]["id"]
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logger.warning(f"Could not read the {GITEA_BRANCH} commit, revalidating every cached file: {e}")
+        return None
+
+def load_cached_file(cache_file):
+    """Load a cached Gitea file entry, or None if there is no usable entry."""
+    if not cache_file.exists():
+        return None
+    
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not read cached file {cache_file}: {e}")
+        return None
+
+def save_cached_file(cache_file, entry):
+    """Save a Gitea file entry so later runs can revalidate it instead of downloading it."""
+    try:
+        GITEA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+    except OSError as e:
+        logger.warning(f"Could not write cached file {cache_file}: {e}")
+
 def get_gitea_file_content(path):
-    """Get the content of a file from Gitea."""
+    """Get the content of a file from Gitea, reusing the on-disk copy when it is still current."""
     url = f"{GITEA_BASE_URL}/repos/{GITEA_REPO_OWNER}/{GITEA_REPO_NAME}/raw/{path}?ref={GITEA_BRANCH}"
-    headers = {"Authorization": f"token {GITEA_API_KEY}"}
+    cache_file = GITEA_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+    cached = load_cached_file(cache_file)
+    
+    # A copy validated at the current branch commit cannot be stale
+    if cached and branch_sha and cached.get("sha") == branch_sha:
+        return cached["body"]
+    
+    # Otherwise ask Gitea whether the file changed; an unchanged file costs a bodiless 304
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
     
     try:
-        response = requests.get(url, headers=headers)
+        # (connect, read) timeouts so a stalled server cannot hang the import
+        response = gitea_session.get(url, headers=headers, timeout=(5, 30))
         
-        if response.status_code == 200:
-            return response.text
+        if response.status_code == 304 and cached:
+            body = cached["body"]
+        elif response.status_code == 200:
+            body = response.text
         else:
             logger.error(f"Error fetching {path}: HTTP {response.status_code}")
             return None
     except requests.RequestException as e:
         logger.error(f"Request failed for {path}: {str(e)}")
         return None
+    
+    # A 304 may omit the validators, so keep the ones already stored
+    etag = response.headers.get("ETag") or (cached or {}).get("etag")
+    last_modified = response.headers.get("Last-Modified") or (cached or {}).get("last_modified")
+    save_cached_file(cache_file, {"etag": etag, "last_modified": last_modified, "sha": branch_sha, "body": body})
+    return body
+
+# Child pages of the parent page keyed by title, loaded once in main() when skipping existing articles
+existing_pages = {}
+
+def load_existing_pages(parent_id):
+    """Page through the parent's children once and index its child pages by title."""
+    global existing_pages
+    pages = {}
+    start_cursor = None
+    
+    try:
+        while True:
+            if start_cursor:
+                response = notion.blocks.children.list(block_id=parent_id, start_cursor=start_cursor, page_size=100)
+            else:
+                response = notion.blocks.children.list(block_id=parent_id, page_size=100)
+            
+            for block in response["results"]:
+                if block.get("type") == "child_page":
+                    # Keep the first match, like the search returning the first hit
+                    pages.setdefault(block["child_page"]["title"], block["id"])
+            
+            if not response["has_more"]:
+                break
+            
+            start_cursor = response["next_cursor"]
+    except Exception as e:
+        logger.error(f"Error listing existing pages: {str(e)}")
+    
+    existing_pages = pages
+    logger.info(f"Found {len(existing_pages)} existing pages under the parent page")
 
 def check_article_exists(title):
     """Check if an article with the given title already exists in Notion."""
+    # Pages under the parent were indexed up front; only search for titles not found there
+    if title in existing_pages:
+        return existing_pages[title]
+    
     try:
         search_params = {
             "query": title,
@@ -119,10 +260,23 @@ def check_article_exists(title):
         logger.error(f"Error checking if article exists: {str(e)}")
         return None
 
+# Block types that accept children when created (headings only when toggleable)
+NESTABLE_BLOCK_TYPES = frozenset({
+    "paragraph", "bulleted_list_item", "numbered_list_item", "quote", "callout", "toggle", "to_do"
+})
+
+def nest_child_block(parent_block, child_block):
+    """Nest a child block in its parent so both are created in the same request."""
+    block_type = parent_block["type"]
+    if block_type not in NESTABLE_BLOCK_TYPES:
+        logger.error(f"Error adding child block: {block_type} blocks cannot have children")
+        return
+    
+    parent_block[block_type].setdefault("children", []).append(child_block)
+
 def process_nested_blockquotes(lines, start_index):
-    """Process nested blockquotes and return blocks for them along with parent-child relationships."""
+    """Process nested blockquotes and return blocks for them, with level 2 quotes nested in their parents."""
     blocks = []
-    parent_child_relations = []  # List of (parent_index, child_block) tuples
     i = start_index
     
     # Group lines by blockquote level
@@ -179,17 +333,15 @@ def process_nested_blockquotes(lines, start_index):
             }
         }
         
-        # For level 2 blockquotes (> >), track them for later addition as children
+        # For level 2 blockquotes (> >), nest them in the previous block
         if level == 2 and blocks:
-            # Remember to add this as a child of the previous block
-            parent_index = len(blocks) - 1
-            parent_child_relations.append((parent_index, block))
+            nest_child_block(blocks[-1], block)
         else:
             blocks.append(block)
     
-    return blocks, parent_child_relations, i
+    return blocks, i
 
-def create_notion_page(parent_id, title, subtitle, content, skip_existing=False):
+def create_notion_page(parent_id, title, subtitle, content, skip_existing=False, previous_created=None, created=None):
     """Create a new page in Notion with the provided content."""
     # Check if page already exists
     if skip_existing:
@@ -199,7 +351,7 @@ def create_notion_page(parent_id, title, subtitle, content, skip_existing=False)
             return existing_id
     
     # Convert markdown content to Notion blocks
-    blocks, parent_child_relations = convert_markdown_to_notion_blocks(content)
+    blocks = convert_markdown_to_notion_blocks(content)
     
     # Create the page
     page_data = {
@@ -262,38 +414,28 @@ def create_notion_page(parent_id, title, subtitle, content, skip_existing=False)
         ]
     }
     
+    # Notion accepts at most 100 children per request, so the page is created with
+    # the first batch and the remaining blocks are appended afterwards
+    children = page_data["children"]
+    batches = [children[i:i+MAX_CHILDREN_PER_REQUEST] for i in range(0, len(children), MAX_CHILDREN_PER_REQUEST)]
+    page_data["children"] = batches[0]
+    
     try:
-        response = notion.pages.create(**page_data)
+        # Wait for the previous article's page so pages appear under the parent in list order.
+        # Only the create call is ordered; conversion above and the appends below run concurrently.
+        if previous_created:
+            previous_created.wait()
+        try:
+            response = notion.pages.create(**page_data)
+        finally:
+            if created:
+                created.set()
         logger.info(f"Successfully created page: {title}")
         
         # The response is a dictionary with the page details, including the ID
         if isinstance(response, dict) and 'id' in response:
-            # Process any parent-child relationships for nested blockquotes
-            if parent_child_relations:
-                page_id = response['id']
-                block_ids = []
-                
-                # First, get all block IDs from the page
-                try:
-                    page_blocks = notion.blocks.children.list(block_id=page_id)
-                    # Skip the title block and subtitle callout which are at index 0 and 1
-                    block_ids = [block['id'] for block in page_blocks['results'][2:]]
-                    logger.debug(f"Retrieved {len(block_ids)} block IDs from the page")
-                    
-                    # Now add child blocks to their parents
-                    for parent_idx, child_block in parent_child_relations:
-                        if parent_idx < len(block_ids):
-                            parent_block_id = block_ids[parent_idx]
-                            try:
-                                notion.blocks.children.append(
-                                    block_id=parent_block_id,
-                                    children=[child_block]
-                                )
-                                logger.debug(f"Added child block to parent {parent_block_id}")
-                            except Exception as e:
-                                logger.error(f"Error adding child block: {str(e)}")
-                except Exception as e:
-                    logger.error(f"Error getting block IDs: {str(e)}")
+            for batch in batches[1:]:
+                notion.blocks.children.append(block_id=response['id'], children=batch)
             
             return response['id']
         else:
@@ -304,180 +446,92 @@ def create_notion_page(parent_id, title, subtitle, content, skip_existing=False)
         logger.error(f"Error creating Notion page: {str(e)}")
         return None
 
+# Inline runs, tried in this order at each position: bold (**text**), italic (*text*),
+# escaped footnote references (\[^n\]) and links ([text](url))
+INLINE_PATTERN = re.compile(
+    r'\*\*(?P<bold>[^*]+)\*\*'
+    r'|\*(?P<italic>[^*]+)\*'
+    r'|\\\[\^(?P<footnote>\d+)\\\]'
+    r'|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)]+)\)'
+)
+
+# Annotations shared by every bold or italic run; the payloads are only serialized, never mutated
+BOLD_ANNOTATIONS = {"bold": True}
+ITALIC_ANNOTATIONS = {"italic": True}
+
+# Digit to unicode superscript table for footnote references
+SUPERSCRIPT_DIGITS = str.maketrans("0123456789", "⁰¹²³⁴⁵⁶⁷⁸⁹")
+
+# Heading markers and the Notion block type each one becomes
+# (Notion only has h1, h2, h3, so h4 is mapped to h3)
+HEADING_TYPES = {
+    "#": "heading_1",
+    "##": "heading_2",
+    "###": "heading_3",
+    "####": "heading_3"
+}
+
+# Line starts that end a multi-line paragraph: headings, quotes, bullets, code fences,
+# footnote definitions and ordered list items
+PARAGRAPH_BREAK_PATTERN = re.compile(r'#{1,4} |> |\* |- |```|\[\^|\d+\.\s')
+
+# Block-level patterns
+# Ordered list item marker ("1. ")
+ORDERED_LIST_PATTERN = re.compile(r'^\d+\.\s')
+# Start of a footnote definition ("[^1]:")
+FOOTNOTE_LABEL_PATTERN = re.compile(r'\[\^(\d+)\]:')
+# Whole footnote definition, up to a blank line or the next definition
+FOOTNOTE_DEF_PATTERN = re.compile(r'\[\^(\d+)\]:\s*(.*?)(?=\n\n|\n\[\^|$)', re.DOTALL)
+
 def parse_rich_text(text):
     """Parse markdown text to create Notion's rich text objects with formatting."""
     rich_text = []
-    
-    # First, handle basic formatting (bold and italic)
-    # Process bold formatting (**text**)
-    bold_pattern = r'\*\*([^*]+)\*\*'
-    # Process italic formatting (*text*)
-    italic_pattern = r'\*([^*]+)\*'
-    # Process footnote references ([^n])
-    footnote_ref_pattern = r'\\\[\^(\d+)\\\]'
-    
-    # Handle links - find all [text](url) patterns
-    link_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-    
-    # Handle formatting first
-    formatted_text = text
-    
-    # Temporary placeholders to preserve formatting
-    placeholders = {}
-    placeholder_count = 0
-    
-    # Handle bold text
-    bold_matches = list(re.finditer(bold_pattern, formatted_text))
-    for match in bold_matches:
-        placeholder = f"__BOLD_PLACEHOLDER_{placeholder_count}__"
-        placeholders[placeholder] = {
-            "type": "bold",
-            "content": match.group(1)
-        }
-        formatted_text = formatted_text.replace(match.group(0), placeholder, 1)
-        placeholder_count += 1
-    
-    # Handle italic text
-    italic_matches = list(re.finditer(italic_pattern, formatted_text))
-    for match in italic_matches:
-        placeholder = f"__ITALIC_PLACEHOLDER_{placeholder_count}__"
-        placeholders[placeholder] = {
-            "type": "italic",
-            "content": match.group(1)
-        }
-        formatted_text = formatted_text.replace(match.group(0), placeholder, 1)
-        placeholder_count += 1
-    
-    # Handle footnote references - mark them for special handling
-    footnote_matches = list(re.finditer(footnote_ref_pattern, formatted_text))
-    for match in footnote_matches:
-        placeholder = f"__FOOTNOTE_PLACEHOLDER_{placeholder_count}__"
-        placeholders[placeholder] = {
-            "type": "footnote",
-            "content": match.group(1)  # Just the number
-        }
-        formatted_text = formatted_text.replace(match.group(0), placeholder, 1)
-        placeholder_count += 1
-    
-    # Process each part, replacing placeholders
-    # If there are no placeholders in the text, just add it as a single text object
-    if not any(placeholder in formatted_text for placeholder in placeholders):
-        # Now handle links with the placeholders in place
-        parts = re.split(link_pattern, formatted_text)
-        
-        # Process each part
-        i = 0
-        while i < len(parts):
-            if i < len(parts) and parts[i]:
-                rich_text.append({
-                    "type": "text",
-                    "text": {"content": parts[i]}
-                })
-            
-            # Link (if available)
-            if i + 2 < len(parts):
-                link_text = parts[i + 1]
-                link_url = parts[i + 2]
-                rich_text.append({
-                    "type": "text",
-                    "text": {
-                        "content": link_text,
-                        "link": {"url": link_url}
-                    }
-                })
-                i += 2
-            
-            i += 1
-    else:
-        # Handle text with placeholders
-        # First split text by placeholders to identify segments
-        segments = []
-        remaining_text = formatted_text
-        
-        # Find all positions of placeholders in the text
-        placeholder_positions = []
-        for placeholder in placeholders:
-            pos = remaining_text.find(placeholder)
-            if pos != -1:
-                placeholder_positions.append((pos, placeholder))
-        
-        # Sort positions
-        placeholder_positions.sort()
-        
-        # Extract segments
-        last_pos = 0
-        for pos, placeholder in placeholder_positions:
-            # Add text before placeholder
-            if pos > last_pos:
-                segments.append(("text", remaining_text[last_pos:pos]))
-            
-            # Add the placeholder
-            segments.append(("placeholder", placeholder))
-            
-            # Update last position
-            last_pos = pos + len(placeholder)
+    last_end = 0
+    
+    # One pass over the text, emitting plain runs between the formatted ones in source order
+    for match in INLINE_PATTERN.finditer(text):
+        if match.start() > last_end:
+            rich_text.append({
+                "type": "text",
+                "text": {"content": text[last_end:match.start()]}
+            })
         
-        # Add any remaining text
-        if last_pos < len(remaining_text):
-            segments.append(("text", remaining_text[last_pos:]))
+        if match.group("bold") is not None:
+            rich_text.append({
+                "type": "text",
+                "text": {"content": match.group("bold")},
+                "annotations": BOLD_ANNOTATIONS
+            })
+        elif match.group("italic") is not None:
+            rich_text.append({
+                "type": "text",
+                "text": {"content": match.group("italic")},
+                "annotations": ITALIC_ANNOTATIONS
+            })
+        elif match.group("footnote") is not None:
+            # Create a small superscript-like representation using unicode
+            superscript_num = match.group("footnote").translate(SUPERSCRIPT_DIGITS)
+            rich_text.append({
+                "type": "text",
+                "text": {"content": superscript_num}
+            })
+        else:
+            rich_text.append({
+                "type": "text",
+                "text": {
+                    "content": match.group("link_text"),
+                    "link": {"url": match.group("link_url")}
+                }
+            })
         
-        # Process segments
-        for segment_type, segment_content in segments:
-            if segment_type == "text":
-                # Process links in this text segment
-                link_parts = re.split(link_pattern, segment_content)
-                
-                j = 0
-                while j < len(link_parts):
-                    if j < len(link_parts) and link_parts[j]:
-                        rich_text.append({
-                            "type": "text",
-                            "text": {"content": link_parts[j]}
-                        })
-                    
-                    # Link (if available)
-                    if j + 2 < len(link_parts):
-                        link_text = link_parts[j + 1]
-                        link_url = link_parts[j + 2]
-                        rich_text.append({
-                            "type": "text",
-                            "text": {
-                                "content": link_text,
-                                "link": {"url": link_url}
-                            }
-                        })
-                        j += 2
-                    
-                    j += 1
-            
-            elif segment_type == "placeholder":
-                # Get placeholder data
-                data = placeholders[segment_content]
-                
-                if data["type"] == "bold":
-                    rich_text.append({
-                        "type": "text",
-                        "text": {"content": data["content"]},
-                        "annotations": {"bold": True}
-                    })
-                elif data["type"] == "italic":
-                    rich_text.append({
-                        "type": "text",
-                        "text": {"content": data["content"]},
-                        "annotations": {"italic": True}
-                    })
-                elif data["type"] == "footnote":
-                    # Create a small superscript-like representation using unicode
-                    superscript_map = {
-                        '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
-                        '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹'
-                    }
-                    # Convert digits to superscript
-                    superscript_num = ''.join(superscript_map.get(c, c) for c in data['content'])
-                    rich_text.append({
-                        "type": "text",
-                        "text": {"content": superscript_num}
-                    })
+        last_end = match.end()
+    
+    # Add any remaining text
+    if last_end < len(text):
+        rich_text.append({
+            "type": "text",
+            "text": {"content": text[last_end:]}
+        })
     
     # If no text was processed (empty string), add an empty text object
     if not rich_text:
@@ -491,19 +545,16 @@ def parse_rich_text(text):
 def convert_markdown_to_notion_blocks(markdown_content):
     """Convert markdown content to Notion blocks."""
     blocks = []
-    parent_child_relations = []  # To track parent-child relationships
     
     # Split the content into lines
     lines = markdown_content.splitlines()
     
-    # Process footnotes first to extract them
-    footnotes = {}
-    footnote_pattern = r'\[\^(\d+)\]:\s*(.*?)(?=\n\n|\n\[\^|$)'
-    footnote_matches = re.finditer(footnote_pattern, markdown_content, re.DOTALL)
-    for match in footnote_matches:
-        footnote_num = match.group(1)
-        footnote_text = match.group(2).strip()
-        footnotes[footnote_num] = footnote_text
+    # Footnote definitions anywhere in the document (indented, or inside a quote or list
+    # item too), collected in one pass and added at the end
+    footnotes = {
+        match.group(1): match.group(2).strip()
+        for match in FOOTNOTE_DEF_PATTERN.finditer(markdown_content)
+    }
     
     i = 0
     while i < len(lines):
@@ -514,37 +565,15 @@ def convert_markdown_to_notion_blocks(markdown_content):
             i += 1
             continue
         
-        # Check for headings
-        if line.startswith("# "):
-            blocks.append({
-                "object": "block",
-                "type": "heading_1",
-                "heading_1": {
-                    "rich_text": parse_rich_text(line[2:])
-                }
-            })
-        elif line.startswith("## "):
-            blocks.append({
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": parse_rich_text(line[3:])
-                }
-            })
-        elif line.startswith("### "):
-            blocks.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": parse_rich_text(line[4:])
-                }
-            })
-        elif line.startswith("#### "):
+        # Check for headings; only lines starting with "#" need the marker lookup
+        heading_type = HEADING_TYPES.get(line.split(" ", 1)[0]) if line[0] == "#" and " " in line else None
+        
+        if heading_type:
             blocks.append({
                 "object": "block",
-                "type": "heading_3",  # Notion only has h1, h2, h3, so we use h3 for h4
-                "heading_3": {
-                    "rich_text": parse_rich_text(line[5:])
+                "type": heading_type,
+                heading_type: {
+                    "rich_text": parse_rich_text(line[line.index(" ") + 1:])
                 }
             })
         
@@ -581,22 +610,16 @@ def convert_markdown_to_notion_blocks(markdown_content):
                 }
                 
                 # Add this as a child of the previous block
-                parent_index = len(blocks) - 1
-                parent_child_relations.append((parent_index, child_block))
+                nest_child_block(blocks[-1], child_block)
                 
                 # Advance i to after the last blockquote line
                 i = current_i
                 continue
             else:
-                # Process blockquotes and collect parent-child relations
-                quote_blocks, quote_relations, new_i = process_nested_blockquotes(lines, i)
+                # Process blockquotes, nested quotes are already attached to their parents
+                quote_blocks, new_i = process_nested_blockquotes(lines, i)
                 blocks.extend(quote_blocks)
                 
-                # Calculate parent indices relative to all blocks
-                base_index = len(blocks) - len(quote_blocks)
-                for parent_idx, child_block in quote_relations:
-                    parent_child_relations.append((base_index + parent_idx, child_block))
-                
                 # Advance i to after the last blockquote line
                 i = new_i
                 
@@ -646,13 +669,13 @@ def convert_markdown_to_notion_blocks(markdown_content):
             continue  # Skip the increment at the end as we've already advanced i
         
         # Check for ordered lists
-        elif re.match(r'^\d+\.\s', line):
+        elif line[0].isdigit() and ORDERED_LIST_PATTERN.match(line):
             list_items = []
             
             # Collect all consecutive list items
-            while i < len(lines) and re.match(r'^\d+\.\s', lines[i].strip()):
+            while i < len(lines) and ORDERED_LIST_PATTERN.match(lines[i].strip()):
                 # Extract content after the number and period
-                list_content = re.sub(r'^\d+\.\s', '', lines[i].strip())
+                list_content = ORDERED_LIST_PATTERN.sub('', lines[i].strip())
                 list_items.append({
                     "rich_text": parse_rich_text(list_content)
                 })
@@ -703,9 +726,12 @@ def convert_markdown_to_notion_blocks(markdown_content):
             continue  # Skip the increment at the end as we've already advanced i
         
         # Check for footnote definitions
-        elif re.match(r'\[\^(\d+)\]:', line):
-            # Skip footnote definitions as we've already processed them
+        elif FOOTNOTE_LABEL_PATTERN.match(line):
+            # Already collected above; skip the definition and its continuation lines,
+            # which run until a blank line or the next definition
             i += 1
+            while i < len(lines) and lines[i].strip() and not lines[i].strip().startswith("[^"):
+                i += 1
             continue
         
         # Default to paragraph
@@ -715,11 +741,11 @@ def convert_markdown_to_notion_blocks(markdown_content):
             next_i = i + 1
             
             # Collect lines until we hit an empty line or a special format
-            while (next_i < len(lines) and 
-                  lines[next_i].strip() and 
-                  not lines[next_i].strip().startswith(("# ", "## ", "### ", "#### ", "> ", "* ", "- ", "```", "[^")) and
-                  not re.match(r'^\d+\.\s', lines[next_i].strip())):
-                paragraph_lines.append(lines[next_i].strip())
+            while next_i < len(lines):
+                next_line = lines[next_i].strip()
+                if not next_line or PARAGRAPH_BREAK_PATTERN.match(next_line):
+                    break
+                paragraph_lines.append(next_line)
                 next_i += 1
             
             # Join the paragraph lines
@@ -767,60 +793,95 @@ def convert_markdown_to_notion_blocks(markdown_content):
                 }
             })
     
-    return blocks, parent_child_relations
+    return blocks
 
-def process_article(article_folder, skip_existing=False):
+def process_article(article_folder, skip_existing=False, previous_created=None, created=None):
     """Process a single article by folder name."""
     base_path = f"translate/{article_folder}"
     
-    # Get article components
-    title_content = get_gitea_file_content(f"{base_path}/title.md")
-    subtitle_content = get_gitea_file_content(f"{base_path}/sub-title.md")
-    main_content = get_gitea_file_content(f"{base_path}/01.md")
-    
-    if not all([title_content, subtitle_content, main_content]):
-        logger.error(f"Failed to fetch all components for {article_folder}")
-        return None
-    
-    # Create Notion page
-    page_id = create_notion_page(
-        NOTION_PARENT_PAGE_ID,
-        title_content.strip(),
-        subtitle_content.strip(),
-        main_content,
-        skip_existing
-    )
-    
-    return page_id
+    try:
+        # Get article components; the three files are independent, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=FILES_PER_ARTICLE) as executor:
+            title_content, subtitle_content, main_content = executor.map(get_gitea_file_content, [
+                f"{base_path}/title.md",
+                f"{base_path}/sub-title.md",
+                f"{base_path}/01.md"
+            ])
+        
+        if not all([title_content, subtitle_content, main_content]):
+            logger.error(f"Failed to fetch all components for {article_folder}")
+            return None
+        
+        # Create Notion page
+        page_id = create_notion_page(
+            NOTION_PARENT_PAGE_ID,
+            title_content.strip(),
+            subtitle_content.strip(),
+            main_content,
+            skip_existing,
+            previous_created,
+            created
+        )
+        
+        return page_id
+    finally:
+        # Skipped or failed articles pass the turn on once the earlier pages exist,
+        # so they neither hold up the pages after them nor let them jump ahead
+        if created:
+            if previous_created:
+                previous_created.wait()
+            created.set()
 
 def main():
     """Main function to process all articles."""
     parser = argparse.ArgumentParser(description='Import Translation Academy articles to Notion')
     parser.add_argument('--input', '-i', default="articles_to_import.txt", help='Input file with article folders to import')
     parser.add_argument('--skip-existing', '-s', action='store_true', help='Skip articles that already exist')
-    parser.add_argument('--delay', '-d', type=float, default=1.0, help='Delay between imports in seconds (to avoid rate limiting)')
+    parser.add_argument('--workers', '-w', type=int, default=MAX_WORKERS, help='Number of articles to fetch and convert concurrently (pages are still created in list order)')
+    parser.add_argument('--delay', '-d', type=float, help='Deprecated and ignored; Notion calls are paced by the shared rate limiter')
     args = parser.parse_args()
     
+    if args.delay is not None:
+        logger.warning("--delay is deprecated and ignored: the Notion rate limiter now paces requests (use --workers to tune concurrency)")
+    
     articles = read_article_list(args.input)
     
     logger.info(f"Found {len(articles)} articles to import")
+    
+    # Each worker fetches FILES_PER_ARTICLE files at once, so give each fetch its own connection
+    if args.workers != MAX_WORKERS:
+        mount_gitea_adapter(args.workers)
+    
+    # Cached files validated at this commit are reused without asking Gitea again
+    global branch_sha
+    branch_sha = fetch_branch_sha()
+    
+    # One listing of the parent page answers most existence checks without a search per article
+    if args.skip_existing:
+        load_existing_pages(NOTION_PARENT_PAGE_ID)
     successful = 0
     failed = 0
     
-    for i, article in enumerate(articles):
-        logger.info(f"Processing article {i+1}/{len(articles)}: {article}")
-        page_id = process_article(article, args.skip_existing)
-        
-        if page_id:
-            logger.info(f"Created Notion page with ID: {page_id}")
-            successful += 1
-        else:
-            logger.error(f"Failed to create Notion page for {article}")
-            failed += 1
+    # Keep several articles in flight; the shared limiter keeps Notion calls under the rate limit.
+    # Each article waits for the previous one's page before creating its own, so the parent
+    # page lists them in file order. Workers start in submission order, so no wait can deadlock.
+    created_events = [threading.Event() for _ in articles]
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(process_article, article, args.skip_existing, created_events[i - 1] if i else None, created_events[i]): article
+            for i, article in enumerate(articles)
+        }
         
-        # Avoid rate limiting
-        if i < len(articles) - 1 and args.delay > 0:
-            time.sleep(args.delay)
+        for i, future in enumerate(as_completed(futures)):
+            article = futures[future]
+            page_id = future.result()
+            
+            if page_id:
+                logger.info(f"[{i+1}/{len(articles)}] Created Notion page for {article} with ID: {page_id}")
+                successful += 1
+            else:
+                logger.error(f"[{i+1}/{len(articles)}] Failed to create Notion page for {article}")
+                failed += 1
     
     logger.info(f"Import completed. Success: {successful}, Failed: {failed}")
 
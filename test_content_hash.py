@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test that migration_v8 only stores a page's Content Hash after its content is written.
+
+Runs offline: the Notion client in migration_v8 is replaced with a mock.
+"""
+
+import os
+from unittest import mock
+
+# Placeholder keys so migration_v8 imports without a .env; no real requests are made
+os.environ.setdefault("NOTION_API_KEY", "test-notion-key")
+os.environ.setdefault("GITEA_API_KEY", "test-gitea-key")
+
+import migration_v8
+
+OLD_HASH = "old-content-hash"
+
+def make_article_data():
+    """Minimal article data accepted by create_database_properties."""
+    return {
+        'article_id': 'test-article',
+        'section': 'translate',
+        'title': 'Test Article',
+        'subtitle': 'A test article',
+        'content': '# Heading\n\nSome **bold** text.\n\n- item one\n- item two',
+        'content_hash': 'new-content',
+        'repository_path': 'translate/test-article',
+        'gitea_url': 'https://git.door43.org/unfoldingWord/en_ta/src/branch/master/translate/test-article',
+    }
+
+def make_notion_mock(existing_page=None, append_error=None):
+    """Mock Notion client holding one page, optionally failing every block append."""
+    notion = mock.MagicMock()
+    notion.databases.query.return_value = {"results": [existing_page] if existing_page else []}
+    notion.pages.create.return_value = {"id": "new-page"}
+    notion.blocks.children.list.return_value = {"results": [{"id": "old-block"}], "has_more": False}
+    
+    if append_error:
+        notion.blocks.children.append.side_effect = append_error
+    else:
+        notion.blocks.children.append.side_effect = lambda block_id, children: {
+            "results": [{"id": f"block-{i}"} for i in range(len(children))]
+        }
+    
+    return notion
+
+def stored_hashes(notion):
+    """Content Hash values sent through pages.create or pages.update."""
+    hashes = []
+    for call in notion.pages.create.call_args_list + notion.pages.update.call_args_list:
+        content_hash = call[1]["properties"].get("Content Hash")
+        if content_hash:
+            hashes.append(content_hash["rich_text"][0]["text"]["content"])
+    return hashes
+
+def run_migration(notion):
+    """Run create_or_update_database_entry against the mock client."""
+    migrator = migration_v8.FinalFixedTAMigrator()
+    relationships = {'dependencies': [], 'recommended': []}
+    
+    with mock.patch.object(migration_v8, "notion", notion):
+        return migrator.create_or_update_database_entry(make_article_data(), relationships, 1)
+
+def test_failed_append_keeps_old_hash():
+    """An existing page whose new blocks fail to append keeps its old hash."""
+    existing_page = {
+        "id": "existing-page",
+        "properties": {"Content Hash": {"rich_text": [{"plain_text": OLD_HASH}]}}
+    }
+    notion = make_notion_mock(existing_page, append_error=Exception("append failed"))
+    
+    page_id = run_migration(notion)
+    
+    assert page_id is None, f"expected a failed migration, got {page_id}"
+    assert stored_hashes(notion) == [], f"hash was overwritten: {stored_hashes(notion)}"
+
+def test_failed_append_on_new_page_stores_no_hash():
+    """A new page whose blocks fail to append is created without a hash."""
+    notion = make_notion_mock(append_error=Exception("append failed"))
+    
+    page_id = run_migration(notion)
+    
+    assert page_id is None, f"expected a failed migration, got {page_id}"
+    assert notion.pages.create.called, "page was not created"
+    assert stored_hashes(notion) == [], f"hash was stored: {stored_hashes(notion)}"
+
+def test_hash_stored_after_content():
+    """A successful update stores the new hash in a final pages.update."""
+    existing_page = {
+        "id": "existing-page",
+        "properties": {"Content Hash": {"rich_text": [{"plain_text": OLD_HASH}]}}
+    }
+    notion = make_notion_mock(existing_page)
+    
+    page_id = run_migration(notion)
+    
+    assert page_id == "existing-page", f"expected existing-page, got {page_id}"
+    assert len(stored_hashes(notion)) == 1, f"expected one hash write, got {stored_hashes(notion)}"
+    assert stored_hashes(notion)[0] != OLD_HASH, "hash was not updated"
+    
+    # The hash update must come after every block write
+    writes = [(name, kwargs) for name, args, kwargs in notion.mock_calls if name in ("blocks.children.append", "pages.update")]
+    last_name, last_kwargs = writes[-1]
+    assert last_name == "pages.update" and "Content Hash" in last_kwargs["properties"], "hash was not written last"
+
+if __name__ == "__main__":
+    for test in (test_failed_append_keeps_old_hash, test_failed_append_on_new_page_stores_no_hash, test_hash_stored_after_content):
+        try:
+            test()
+            print(f"PASS: {test.__name__}")
+        except AssertionError as e:
+            print(f"FAIL: {test.__name__}: {e}")